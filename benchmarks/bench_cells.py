@@ -0,0 +1,19 @@
+import numpy as np
+
+from utils.parse_cells import parse_cells
+
+# Six segments over ten years of quarters, formatted the way the PDFs print them
+ROWS = [[f'${value:,}' if i == 0 else f'{value:,}' for i, value in enumerate(row)]
+        for row in np.random.default_rng(0).integers(50, 40_000, size=(6, 40)).tolist()]
+ROWS[2][5] = '\u2014'
+ROWS[3][7] = '(1,200)'
+
+
+def bench_parse_value_loop():
+    # The previous per-cell conversion, which cannot represent dashes or parentheses
+    [[int(item.replace('$', '').replace(',', '')) for item in row if item and item[0] not in '(\u2014']
+     for row in ROWS]
+
+
+def bench_parse_cells():
+    parse_cells(ROWS, 40)
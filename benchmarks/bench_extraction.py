@@ -0,0 +1,37 @@
+import os
+
+import pdfplumber
+
+import read_pdf
+
+PDF_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                        'Rev_by_Mkt_Qtrly_Trend_Q325.pdf')
+
+
+def bench_extract_auto():
+    read_pdf.extract_data_from_pdf(PDF_PATH)
+
+
+def bench_extract_pdfium():
+    read_pdf.extract_data_from_pdf(PDF_PATH, backend='pdfium')
+
+
+def bench_extract_pdfplumber():
+    read_pdf.extract_data_from_pdf(PDF_PATH, backend='pdfplumber')
+
+
+def bench_extract_pdfplumber_templates():
+    read_pdf.extract_data_from_pdf(PDF_PATH, use_templates=True, backend='pdfplumber')
+
+
+def bench_pdfplumber_table_search_anchor():
+    # Finds the anchor with page.search, which builds a text map, as extraction used to
+    with pdfplumber.open(PDF_PATH) as pdf:
+        for page in pdf.pages:
+            if page.search(read_pdf.ANCHOR_LABELS[0], regex=False, case=False):
+                page.extract_table()
+
+
+def bench_pdfplumber_table_char_anchor():
+    # Finds the anchor in the raw characters; the table settings are the same defaults
+    list(read_pdf.iter_tables_pdfplumber(PDF_PATH))
@@ -0,0 +1,24 @@
+import numpy as np
+
+from utils.calculate_growth_rate import calculate_growth_rate
+from utils.growth_rates import format_growth_rate, quarter_over_quarter, year_over_year
+
+# Ten years of quarters for six segments
+VALUES = np.random.default_rng(0).integers(50, 40_000, size=(6, 40), dtype=np.int64)
+
+
+def bench_calculate_growth_rate_loop():
+    for row in VALUES.tolist():
+        [calculate_growth_rate(row[i], row[i - 1]) if i != 0 else 0 for i in range(len(row))]
+
+
+def bench_quarter_over_quarter():
+    quarter_over_quarter(VALUES)
+
+
+def bench_year_over_year():
+    year_over_year(VALUES)
+
+
+def bench_quarter_over_quarter_formatted():
+    [format_growth_rate(rate) for rate in quarter_over_quarter(VALUES)[-1]]
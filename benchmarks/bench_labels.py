@@ -0,0 +1,30 @@
+import timeit
+
+from utils.normalize_label import normalize_label
+from utils.replace_text import replace_text
+
+# Row labels as they come out of the trend PDFs
+LABELS = ['Data Center', 'Gaming', 'Professional\nVisualization', 'Auto', 'OEM & Other', 'TOTAL',
+          '($ in millions)', 'Automotive', 'OEM & IP']
+
+
+def bench_replace_text():
+    for label in LABELS:
+        replace_text(label)
+
+
+def bench_normalize_label():
+    for label in LABELS:
+        normalize_label(label)
+
+
+def bench_normalize_label_uncached():
+    for label in LABELS:
+        normalize_label.__wrapped__(label)
+
+
+if __name__ == '__main__':
+    for bench in (bench_replace_text, bench_normalize_label, bench_normalize_label_uncached):
+        runs = 20_000
+        best = min(timeit.repeat(bench, number=runs, repeat=5)) / runs / len(LABELS)
+        print(f'{bench.__name__}: {best * 1e9:.0f} ns per label')
@@ -0,0 +1,28 @@
+import io
+from functools import cache
+
+import read_pdf
+from benchmarks.bench_extraction import PDF_PATH
+from utils import chart
+from utils.growth_rates import format_growth_rate, quarter_over_quarter
+
+
+@cache
+def figure():
+    import matplotlib
+    matplotlib.use('Agg')
+
+    data = read_pdf.extract_data_from_pdf(PDF_PATH)
+    growth_rates = [format_growth_rate(rate) for rate in quarter_over_quarter(data['total'])]
+    fig, ax = chart.create_figure()
+    return fig, ax, data, growth_rates
+
+
+def bench_draw_chart():
+    chart.draw_chart(*figure())
+
+
+def bench_render_png():
+    fig, ax, data, growth_rates = figure()
+    chart.draw_chart(fig, ax, data, growth_rates)
+    fig.savefig(io.BytesIO(), format='png')
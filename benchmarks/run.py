@@ -0,0 +1,86 @@
+import argparse
+import importlib
+import json
+import os
+import pkgutil
+import platform
+import sys
+import timeit
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_RESULTS = os.path.join('.benchmarks', 'latest.json')
+DEFAULT_BASELINE = os.path.join('.benchmarks', 'baseline.json')
+DEFAULT_THRESHOLD = 0.25
+
+
+def collect_benchmarks(pattern=''):
+    benchmarks = {}
+    for module_info in pkgutil.iter_modules([BENCHMARKS_DIR]):
+        if not module_info.name.startswith('bench_'):
+            continue
+        module = importlib.import_module(f'benchmarks.{module_info.name}')
+        for name, function in vars(module).items():
+            full_name = f'{module_info.name}.{name}'
+            if name.startswith('bench_') and callable(function) and pattern in full_name:
+                benchmarks[full_name] = function
+    return dict(sorted(benchmarks.items()))
+
+
+def time_benchmark(function, repeat=5):
+    # Warm up once so imports and caches are not billed to the first sample
+    function()
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    # Names of stages that got slower than the baseline by more than the threshold
+    return [name for name, seconds in results.items()
+            if name in baseline and seconds > baseline[name] * (1 + threshold)]
+
+
+def write_json(path, payload):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as output:
+        json.dump(payload, output, indent=2)
+
+
+def main(args):
+    parser = argparse.ArgumentParser(description='Run the benchmark suite and check it against a baseline.')
+    parser.add_argument('-k', dest='pattern', default='', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', default=DEFAULT_RESULTS, help=f'results file (default: {DEFAULT_RESULTS})')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE,
+                        help=f'baseline to compare against (default: {DEFAULT_BASELINE})')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown before a stage fails, as a fraction (default: 0.25)')
+    parser.add_argument('--save-baseline', action='store_true', help='store these results as the new baseline')
+    options = parser.parse_args(args)
+
+    results = {}
+    for name, function in collect_benchmarks(options.pattern).items():
+        results[name] = time_benchmark(function)
+        print(f'{name}: {results[name] * 1e6:.1f} us')
+
+    payload = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    write_json(options.output, payload)
+    if options.save_baseline:
+        write_json(options.baseline, payload)
+        return 0
+
+    try:
+        with open(options.baseline) as stored:
+            baseline = json.load(stored)['results']
+    except FileNotFoundError:
+        print(f"No baseline at '{options.baseline}', run with --save-baseline to create one.")
+        return 0
+
+    regressions = compare(results, baseline, options.threshold)
+    for name in regressions:
+        print(f'Regression: {name} took {results[name] * 1e6:.1f} us, baseline {baseline[name] * 1e6:.1f} us')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -1,61 +1,381 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import signal
 import sys
-
-import matplotlib.pyplot as plt
-import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 
 import read_pdf
-from utils.calculate_growth_rate import calculate_growth_rate
-from utils.replace_text import replace_text
-
-# Step 1: Extract data from the PDF
-data = read_pdf.extract_data_from_pdf(sys.argv[1])
-
-# Step 2: Assign data to variables
-quarters = data['quarters']
-data_center = data['data_center']
-gaming = data['gaming']
-professional_visualization = data['professional_visualization']
-auto = data['auto']
-oem_other = data['oem_other']
-total = data['total']
-
-# Step 3: Calculate growth rates as percentages with + or -
-growth_rates = [calculate_growth_rate(total[i], total[i - 1]) if i != 0 else 0 for i in range(len(total))]
-
-# Step 4: Print growth rates
-for quarter, rate in zip(quarters[1:], growth_rates[1:]):
-    print(f"{quarter}: {rate}%")
-
-# Step 5: Plotting
-x = np.arange(len(quarters))  # the label locations
-width = 0.15  # the width of the bars
-bar_positions = [x - 2 * width, x - width, x, x + width, x + 2 * width, x + 3 * width]
-bar_labels = ['data_center', 'gaming', 'professional_visualization', 'auto', 'oem_other', 'total']
-bar_data = [data_center, gaming, professional_visualization, auto, oem_other, total]
-
-fig, ax = plt.subplots(figsize=(14, 8))
-
-rects = []
-for pos, label, data in zip(bar_positions, bar_labels, bar_data):
-    rect = ax.bar(pos, data, width, label=replace_text(label))
-    rects.append(rect)
-
-# Step 6: Add growth rate annotations
-for i, rate in enumerate(growth_rates):
-    ax.annotate(f'{rate}%', (x[i], total[i]), textcoords="offset points", xytext=(0, 5), ha='center')
-
-# Step 7: Add some text for labels, title, and custom x-axis tick labels, etc.
-ax.set_xlabel('Quarter')
-ax.set_ylabel('Revenue ($ in millions)')
-ax.set_title('NVIDIA Quarterly Revenue Trend by Market')
-ax.set_xticks(x)
-ax.set_xticklabels(quarters)
-ax.legend()
-
-# Rotate the tick labels for better readability
-plt.xticks(rotation=45)
-
-# Step 8: Adjust layout and save the figure
-fig.tight_layout()
-plt.savefig('nvidia-revenue-trend.png')
-plt.show()
+import server
+from utils import chart
+from utils.archives import ARCHIVE_ERRORS, is_archive
+from utils.binary_series import write_binary
+from utils.extraction_cache import DEFAULT_CACHE_DIR, ExtractionCache
+from utils.growth_rates import format_growth_rate, quarter_over_quarter
+from utils.instrumentation import stage, start_recording, stop_recording
+from utils.profiling import collapsed_path, profile
+from utils.revenue_store import DEFAULT_STORE_PATH, RevenueStore
+from utils.table_templates import clear_templates
+from utils.watcher import watch_directory
+
+COMMANDS = ('extract', 'growth', 'plot', 'watch', 'serve')
+
+
+def collect_pdf_paths(args):
+    paths = []
+    for arg in args:
+        if os.path.isdir(arg):
+            # Expand a directory into the PDFs it contains
+            paths.extend(sorted(glob.glob(os.path.join(arg, '*.pdf'))))
+        elif any(char in arg for char in '*?['):
+            # Expand glob patterns ourselves so quoted patterns work too
+            paths.extend(sorted(glob.glob(arg)))
+        else:
+            paths.append(arg)
+
+    # Drop duplicates while keeping the order the paths were given in
+    return list(dict.fromkeys(os.path.normpath(path) for path in paths))
+
+
+def report_growth(pdf_path, data):
+    # Calculate growth rates for every segment at once, formatted with + or - only for display
+    rates = quarter_over_quarter(data.float_values())
+    growth_rates = [format_growth_rate(rate) for rate in rates[data.segment_index('total')]]
+
+    print(f"{pdf_path}:")
+    for quarter, rate in zip(data.quarters[1:], growth_rates[1:]):
+        print(f"{quarter}: {rate}")
+    return growth_rates
+
+
+def render_chart(options, source, data, growth_rates, figure):
+    # Leave the chart untouched when it was already rendered from the same data and settings
+    fingerprint = chart.chart_fingerprint(data, options.formats, options.dpi)
+    if not options.force and chart.is_up_to_date(fingerprint, options.output, options.formats):
+        print(f"Chart for '{source}' is up to date.")
+        return
+
+    # The figure is created on first use and then redrawn, so repeated renders reuse it
+    with stage('draw'):
+        if not figure:
+            figure.extend(chart.create_figure())
+        fig, ax = figure
+        chart.draw_chart(fig, ax, data, growth_rates)
+
+    # Save the figure in every requested format
+    with stage('save'):
+        chart.save_chart(fig, options.output, options.formats, options.dpi)
+        chart.write_fingerprint(fingerprint, options.output)
+
+
+def parse_args(args):
+    # Plotting stays the default, so `python main.py <PDF>` keeps working
+    if not args or (args[0] not in COMMANDS and args[0] not in ('-h', '--help')):
+        args = ['plot', *args]
+
+    inputs = argparse.ArgumentParser(add_help=False)
+    inputs.add_argument('pdfs', nargs='*', help='PDF files, zip/tar archives of PDFs, directories or glob patterns')
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--workers', type=int, default=None,
+                        help='number of extraction processes (default: one per CPU)')
+    common.add_argument('--chunksize', type=int, default=1,
+                        help='number of PDFs handed to a worker at a time')
+    common.add_argument('--backend', choices=read_pdf.BACKENDS, default='auto',
+                        help='extraction backend; auto uses pypdfium2 and falls back to pdfplumber')
+    common.add_argument('--table-templates', action='store_true',
+                        help='reuse the table grid learned from earlier PDFs with the same layout (pdfplumber)')
+    common.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR,
+                        help=f'directory for cached extraction results (default: {DEFAULT_CACHE_DIR})')
+    common.add_argument('--no-cache', action='store_true', help='always re-parse the PDFs')
+    common.add_argument('--clear-cache', action='store_true', help='empty the cache before extracting')
+    common.add_argument('--store', metavar='PATH',
+                        help='SQLite store to merge the PDFs into; commands then use its full history')
+    common.add_argument('--binary-out', metavar='PATH',
+                        help='also write the latest series as a memory-mappable binary file')
+    common.add_argument('--metrics', metavar='PATH',
+                        help="record wall and CPU time per stage and write them here ('-' for stdout)")
+    common.add_argument('--metrics-memory', action='store_true',
+                        help='also record peak memory per stage with tracemalloc, which slows extraction several times')
+    common.add_argument('--metrics-format', choices=('json', 'prometheus'), default='json',
+                        help='format of the --metrics output (default: json)')
+    common.add_argument('--profile', metavar='PATH',
+                        help='run under cProfile, writing pstats to PATH and collapsed stacks next to it')
+
+    rendering = argparse.ArgumentParser(add_help=False)
+    rendering.add_argument('--output', default=chart.DEFAULT_OUTPUT,
+                           help=f'chart path; with --format only its stem is used (default: {chart.DEFAULT_OUTPUT})')
+    rendering.add_argument('--format', dest='formats', action='append', choices=chart.FORMATS,
+                           help='image format to write, may be repeated to write several from one drawing')
+    rendering.add_argument('--dpi', type=float, default=None, help='resolution of raster formats')
+    rendering.add_argument('--force', action='store_true', help='render even if the data has not changed')
+
+    parser = argparse.ArgumentParser(description='Extract and plot NVIDIA quarterly revenue by market.')
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('extract', parents=[inputs, common], help='print the extracted revenue tables as JSON')
+    commands.add_parser('growth', parents=[inputs, common], help='print quarter-over-quarter total revenue growth')
+    plot = commands.add_parser('plot', parents=[inputs, common, rendering],
+                               help='print growth and plot the revenue trend (default)')
+    plot.add_argument('--no-show', action='store_true', help='write the chart without opening a window')
+    watch = commands.add_parser('watch', parents=[common, rendering],
+                                help='ingest PDFs into the store and re-render the chart as they land')
+    watch.add_argument('directory', help='directory to watch for PDFs')
+    watch.add_argument('--debounce', type=float, default=2.0,
+                       help='seconds a PDF must stay unchanged before it is ingested (default: 2)')
+    watch.add_argument('--poll-interval', type=float, default=1.0,
+                       help='seconds between checks for new PDFs (default: 1)')
+    watch.add_argument('--polling', action='store_true', help='poll the directory instead of using inotify')
+
+    serve = commands.add_parser('serve', parents=[inputs, common],
+                                help='serve the revenue series, growth rates and charts over HTTP')
+    serve.add_argument('--host', default='127.0.0.1', help='address to listen on (default: 127.0.0.1)')
+    serve.add_argument('--port', type=int, default=8000, help='port to listen on (default: 8000)')
+    serve.add_argument('--format', dest='formats', action='append', choices=chart.FORMATS,
+                       help='chart formats to pre-render (default: png and svg)')
+    serve.add_argument('--dpi', type=float, default=None, help='resolution of raster charts')
+    serve.add_argument('--uploads', action='store_true',
+                       help='accept PDFs at POST /jobs and extract them in the background')
+    serve.add_argument('--queue-size', type=int, default=16,
+                       help='uploads that may wait for a worker before new ones are refused (default: 16)')
+
+    options = parser.parse_args(args)
+    if options.command == 'watch':
+        options.store = options.store or DEFAULT_STORE_PATH
+    return options
+
+
+def main(args):
+    options = parse_args(args)
+    if options.profile:
+        # Keep extraction in this process so its hot spots show up in the profile
+        if options.workers is None:
+            options.workers = 1
+        with profile(options.profile):
+            status = run_with_metrics(options)
+        print(f"Profile written to '{options.profile}' and '{collapsed_path(options.profile)}'.")
+        return status
+    return run_with_metrics(options)
+
+
+def run_with_metrics(options):
+    if not options.metrics:
+        return run(options)
+
+    recorder = start_recording(trace_memory=options.metrics_memory)
+    try:
+        return run(options)
+    finally:
+        stop_recording()
+        metrics = recorder.to_prometheus() if options.metrics_format == 'prometheus' else recorder.to_json() + '\n'
+        if options.metrics == '-':
+            sys.stdout.write(metrics)
+        else:
+            with open(options.metrics, 'w') as output:
+                output.write(metrics)
+
+
+def run(options):
+    if options.command == 'watch':
+        return run_watch(options)
+
+    pdf_paths = collect_pdf_paths(options.pdfs)
+    if not pdf_paths and not options.store and not (options.command == 'serve' and options.uploads):
+        print("No PDF files found.")
+        return 1
+
+    extracted, succeeded = load_datasets(options, pdf_paths)
+
+    if options.command == 'serve':
+        return run_server(options, extracted)
+
+    if options.command == 'extract':
+        print(json.dumps({source: data.to_dict() if data else None for source, data in extracted.items()},
+                         indent=2))
+        return 0 if succeeded and all(extracted.values()) else 1
+
+    figure = []
+    processed = 0
+    latest = None
+    for pdf_path, data in extracted.items():
+        if not data:
+            print(f"Skipping '{pdf_path}': no data extracted.")
+            continue
+
+        # Step 4: Calculate and print growth rates
+        with stage('growth'):
+            growth_rates = report_growth(pdf_path, data)
+        latest = (pdf_path, data, growth_rates)
+        processed += 1
+
+    # Step 5: Every PDF would be drawn to the same output, so only the last one is rendered. Rendering each in turn
+    # would overwrite the fingerprint and force a re-render of the whole batch on every rerun.
+    if options.command == 'plot' and latest:
+        render_chart(options, *latest, figure)
+
+    # Step 6: Show the chart
+    if figure and not options.no_show:
+        with stage('show'):
+            chart.show_charts()
+
+    return 0 if succeeded and processed == len(extracted) else 1
+
+
+def open_cache(options):
+    cache = ExtractionCache(options.cache_dir, version=read_pdf.PARSER_VERSION)
+    if options.clear_cache:
+        cache.clear()
+        clear_templates(template_dir(options))
+    return cache
+
+
+def template_dir(options):
+    # Learned table grids live next to the extraction cache, so they outlast a single run or worker pool
+    return os.path.join(options.cache_dir, 'templates')
+
+
+def load_datasets(options, pdf_paths):
+    cache = open_cache(options)
+
+    # Step 1: Extract data from the PDFs, and from the PDFs inside any archives, in the order they were given
+    settings = dict(max_workers=options.workers, chunksize=options.chunksize,
+                    cache=None if options.no_cache else cache, use_templates=options.table_templates,
+                    backend=options.backend, template_dir=template_dir(options))
+    with stage('extract'):
+        pdfs = read_pdf.extract_data_from_pdfs([path for path in pdf_paths if not is_archive(path)], **settings)
+        extracted = {}
+        for path in pdf_paths:
+            if not is_archive(path):
+                extracted[path] = pdfs[path]
+                continue
+            try:
+                members = read_pdf.extract_data_from_archive(path, **settings)
+            except ARCHIVE_ERRORS as error:
+                print(f"Error reading the archive '{path}': {error}")
+                members = {path: None}
+            if not members:
+                print(f"No PDF files found in '{path}'.")
+                members = {path: None}
+            extracted.update(members)
+    succeeded = all(extracted.values())
+
+    # Step 2: Merge the PDFs into the store and carry on with the full history it holds
+    if options.store:
+        with stage('store'), RevenueStore(options.store) as store:
+            for pdf_path, data in extracted.items():
+                if not data:
+                    print(f"Skipping '{pdf_path}': no data extracted.")
+                    continue
+                try:
+                    restated = store.ingest(data, pdf_path)
+                except ValueError as error:
+                    print(f"Skipping '{pdf_path}': {error}")
+                    succeeded = False
+                    continue
+                if restated:
+                    print(f"'{pdf_path}' restated {restated} value(s).")
+            extracted = {options.store: store.load()}
+
+    # Step 3: Like the chart, the binary file holds the last series that was extracted
+    if options.binary_out:
+        latest = [data for data in extracted.values() if data]
+        if latest:
+            with stage('binary'):
+                write_binary(latest[-1], options.binary_out)
+
+    return extracted, succeeded
+
+
+def run_server(options, extracted):
+    latest = [data for data in extracted.values() if data]
+    if not latest and not options.uploads:
+        print("No revenue data to serve.")
+        return 1
+
+    formats = tuple(options.formats or ('png', 'svg'))
+    data = latest[-1] if latest else None
+    if not options.uploads:
+        return serve_until_interrupted(options, server.RevenueServer(data, formats, options.dpi))
+
+    # Uploads are parsed in a process pool so a slow PDF never stalls the event loop, with the same settings and
+    # cache as the PDFs given on the command line (already cleared by load_datasets if asked)
+    cache = ExtractionCache(options.cache_dir, version=read_pdf.PARSER_VERSION)
+    extract = partial(read_pdf.extract_data_from_pdf_cached, cache=None if options.no_cache else cache,
+                      use_templates=options.table_templates, backend=options.backend,
+                      template_dir=template_dir(options))
+    with ProcessPoolExecutor(max_workers=options.workers, initializer=ignore_interrupts) as executor:
+        jobs = server.ExtractionJobs(executor, max_queued=options.queue_size, concurrency=options.workers,
+                                     extract=extract)
+        return serve_until_interrupted(options, server.RevenueServer(data, formats, options.dpi, jobs))
+
+
+def serve_until_interrupted(options, revenue_server):
+    try:
+        asyncio.run(server.serve_forever(revenue_server, options.host, options.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def ignore_interrupts():
+    # Ctrl+C is meant for the daemon, which shuts the pool down itself
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+
+def run_watch(options):
+    if not os.path.isdir(options.directory):
+        print(f"Error: The directory '{options.directory}' was not found.")
+        return 1
+
+    cache = open_cache(options)
+    figure = []
+
+    # The worker pool, store and chart figure stay warm for the life of the daemon
+    with (ProcessPoolExecutor(max_workers=options.workers, initializer=ignore_interrupts) as executor,
+          RevenueStore(options.store) as store):
+        def ingest(pdf_paths):
+            with stage('extract'):
+                extracted = read_pdf.extract_data_from_pdfs(pdf_paths, chunksize=options.chunksize,
+                                                            cache=None if options.no_cache else cache,
+                                                            use_templates=options.table_templates,
+                                                            backend=options.backend, executor=executor,
+                                                            template_dir=template_dir(options))
+            with stage('store'):
+                for pdf_path, data in extracted.items():
+                    if not data:
+                        continue
+                    try:
+                        restated = store.ingest(data, pdf_path)
+                    except ValueError as error:
+                        print(f"Skipping '{pdf_path}': {error}")
+                        continue
+                    print(f"Ingested '{pdf_path}'" + (f", restating {restated} value(s)." if restated else '.'))
+                data = store.load()
+            if not data:
+                return
+
+            if options.binary_out:
+                with stage('binary'):
+                    write_binary(data, options.binary_out)
+            with stage('growth'):
+                growth_rates = report_growth(options.store, data)
+            render_chart(options, options.store, data, growth_rates, figure)
+
+        # Catch up on PDFs that landed while the daemon was not running
+        existing = collect_pdf_paths([options.directory])
+        if existing:
+            ingest(existing)
+
+        print(f"Watching '{options.directory}' for PDFs, press Ctrl+C to stop.")
+        try:
+            watch_directory(options.directory, ingest, debounce=options.debounce,
+                            poll_interval=options.poll_interval, use_inotify=not options.polling)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
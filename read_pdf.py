@@ -1,30 +1,55 @@
+import heapq
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import chain, islice
+from operator import itemgetter
+
+import numpy as np
 import pdfplumber
+import pypdfium2 as pdfium
+
+from utils.archives import iter_archive_pdfs
+from utils.instrumentation import stage
+from utils.normalize_label import normalize_label
+from utils.parse_cells import parse_cells
+from utils.extraction_cache import content_key
+from utils.pdf_source import is_path, pdfium_input, pdfplumber_input
+from utils.revenue_data import RevenueData
+from utils.table_templates import TableTemplate, load_template, page_fingerprint, save_template
+from utils.text_grid import build_table
+
+# Bump whenever a change to the parser alters what it extracts, so cached results are invalidated
+PARSER_VERSION = '6'
+
+# 'auto' tries the fast pypdfium2 text backend and falls back to pdfplumber when its table does not validate
+BACKENDS = ('auto', 'pdfium', 'pdfplumber')
+
+# Row labels that anchor the revenue table on the page
+ANCHOR_LABELS = ('data center', 'total')
 
-from utils.replace_text import replace_text
+# These are pdfplumber's own defaults, pinned so that an upgrade changing them cannot silently change what we
+# extract. They tune nothing: the revenue table is ruled, so cells come from the drawn lines. The text strategy was
+# tried and splits the quarter headers across cells on these PDFs.
+TABLE_SETTINGS = {'vertical_strategy': 'lines', 'horizontal_strategy': 'lines',
+                  'snap_tolerance': 3, 'join_tolerance': 3, 'intersection_tolerance': 3}
 
+# Revenue table grids learned so far, keyed by page fingerprint
+_table_templates = {}
 
-def extract_data_from_pdf(pdf_path):
-    data = {}
+
+def extract_data_from_pdf(pdf_path, use_templates=False, backend='auto', template_dir=None):
+    # pdf_path may also be the PDF itself: bytes, a memoryview, an mmap or a seekable binary file object
+    data = None
 
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            # Assuming the relevant data is on the first page
-            page = pdf.pages[0]
-            table = page.extract_table()
-
-            if table:
-                # Extract quarters from the first row, skipping the first column header
-                quarters = table[0][1:]
-                data['quarters'] = quarters[::-1]
-
-                # Process the rest of the rows, skipping the first row (headers)
-                for row in table[1:]:
-                    if row:  # Ensure the row is not empty
-                        key = replace_text(row[0].lower())
-                        values = [int(item.replace('$', '').replace(',', '')) for item in row[1:] if item]
-                        data[key] = values[::-1]
-            else:
-                raise ValueError("No table found on the first page.")
+        table = extract_table(pdf_path, use_templates, backend, template_dir)
+
+        if table:
+            data = parse_table(table)
+        else:
+            raise ValueError("No revenue table found in the PDF.")
 
     except FileNotFoundError:
         print(f"Error: The file '{pdf_path}' was not found.")
@@ -34,3 +59,292 @@ def extract_data_from_pdf(pdf_path):
         print(f"An unexpected error occurred: {e}")
 
     return data
+
+
+def parse_table(table):
+    with stage('parse'):
+        # Extract quarters from the first row, skipping the first column header
+        quarters = table[0][1:]
+
+        # Process the rest of the rows, skipping the first row (headers)
+        rows = [row for row in table[1:] if row]  # Ensure the row is not empty
+        values, missing = parse_cells([row[1:] for row in rows], len(quarters))
+
+        # The PDF lists the latest quarter first, so flip to chronological order
+        return RevenueData(quarters[::-1], [normalize_label(row[0]) for row in rows],
+                           values[:, ::-1], missing[:, ::-1])
+
+
+def extract_table(pdf_path, use_templates=False, backend='auto', template_dir=None):
+    # Stop at the first revenue table, which also closes the document
+    for _, table in iter_tables(pdf_path, use_templates, backend, template_dir):
+        return table
+    return None
+
+
+def iter_revenue_tables(pdf_path, use_templates=False, backend='auto', template_dir=None):
+    for page_number, table in iter_tables(pdf_path, use_templates, backend, template_dir):
+        yield page_number, parse_table(table)
+
+
+def iter_tables(pdf_path, use_templates=False, backend='auto', template_dir=None):
+    # Tables come out in page order, so the first one is the first revenue table in the document
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {', '.join(BACKENDS)}.")
+    if backend == 'pdfplumber':
+        yield from iter_tables_pdfplumber(pdf_path, None, use_templates, template_dir)
+        return
+
+    # Valid pdfium tables go out straight away until a page fails validation; later ones are held back until
+    # pdfplumber has re-read the failed pages before them
+    fallback_pages = []
+    held = []
+    yielded = set()
+    failed = False
+    try:
+        for page_number, table in iter_tables_pdfium(pdf_path):
+            # Only trust the fast path when its grid adds up
+            with stage('validate'):
+                valid = is_valid_table(table)
+            if not valid:
+                fallback_pages.append(page_number)
+            elif fallback_pages:
+                held.append((page_number, table))
+            else:
+                yielded.add(page_number)
+                yield page_number, table
+    except pdfium.PdfiumError:
+        failed = True
+
+    if backend == 'pdfium':
+        yield from held
+        return
+
+    # After an error, or when pdfium found no table at all (it may lay the text out differently), pdfplumber reads
+    # every page pdfium has not already handled
+    handled = yielded | {page_number for page_number, _ in held}
+    if failed or not (fallback_pages or handled):
+        fallback = iter_tables_pdfplumber(pdf_path, None, use_templates, template_dir, skip_pages=handled)
+    elif fallback_pages:
+        fallback = iter_tables_pdfplumber(pdf_path, fallback_pages, use_templates, template_dir)
+    else:
+        return
+    yield from heapq.merge(held, fallback, key=itemgetter(0))
+
+
+def iter_tables_pdfium(pdf_path):
+    with pdfium_input(pdf_path) as source:
+        with stage('pdfium.open'):
+            pdf = pdfium.PdfDocument(source)
+        try:
+            for index in range(len(pdf)):
+                page = pdf[index]
+                textpage = page.get_textpage()
+                try:
+                    # Only rebuild the grid on pages whose text mentions the anchor rows
+                    with stage('pdfium.extract_table'):
+                        found = mentions_anchor_text(textpage.get_text_range())
+                        table = build_table(text_runs(textpage)) if found else None
+                    if found:
+                        yield index + 1, table
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+
+def text_runs(textpage):
+    runs = []
+    for index in range(textpage.count_rects()):
+        rect = textpage.get_rect(index)
+        runs.append((*rect, textpage.get_text_bounded(*rect)))
+    return runs
+
+
+def iter_tables_pdfplumber(pdf_path, pages=None, use_templates=False, template_dir=None, skip_pages=frozenset()):
+    with pdfplumber_input(pdf_path) as source:
+        with stage('pdfplumber.open'):
+            pdf = pdfplumber.open(source, pages=pages)
+        with pdf:
+            for page in pdf.pages:
+                if page.page_number in skip_pages:
+                    continue
+                try:
+                    with stage('pdfplumber.extract_table'):
+                        if not mentions_anchor_labels(page.chars):
+                            table = None
+                        elif use_templates:
+                            table = extract_revenue_table(page, template_dir)
+                        else:
+                            table = page.extract_table(TABLE_SETTINGS)
+                    if has_anchor_labels(table):
+                        yield page.page_number, table
+                finally:
+                    # Release the page's parsed layout objects before moving on
+                    page.close()
+
+
+def is_valid_table(table):
+    if not has_anchor_labels(table) or len(table[0]) < 2:
+        return False
+
+    rows = [row for row in table[1:] if row]
+    if any(len(row) != len(table[0]) for row in rows):
+        return False
+    try:
+        values, missing = parse_cells([row[1:] for row in rows], len(table[0]) - 1)
+    except ValueError:
+        return False
+
+    # Every quarter needs a total, and the segments (a dash counting as nothing) must add up to it
+    total_index = [normalize_label(row[0]) for row in rows].index('total')
+    if missing[total_index].any():
+        return False
+    segments = np.delete(values, total_index, axis=0)
+    return bool(np.all(np.abs(segments.sum(axis=0) - values[total_index]) <= len(segments)))
+
+
+def extract_revenue_table(page, template_dir=None):
+    # Later quarters share the layout, so slice the characters straight into the grid learned for it. Grids are
+    # kept in memory and, given a directory, on disk too, so one-PDF runs and fresh worker pools also reuse them.
+    fingerprint = page_fingerprint(page)
+    template = _table_templates.get(fingerprint)
+    if template is None and template_dir:
+        template = load_template(template_dir, fingerprint)
+    if template is not None:
+        table = template.slice(page.chars)
+        if is_valid_table(table):
+            _table_templates[fingerprint] = template
+            return table
+
+    # Locate the table once by looking for the one holding the anchor rows
+    for found in page.find_tables(TABLE_SETTINGS):
+        table = found.extract()
+        if has_anchor_labels(table):
+            _table_templates[fingerprint] = TableTemplate.from_table(found)
+            if template_dir:
+                save_template(template_dir, fingerprint, _table_templates[fingerprint])
+            return table
+
+    return page.extract_table(TABLE_SETTINGS)
+
+
+def mentions_anchor_labels(chars):
+    # Checking the raw characters avoids building the text map that page.search needs
+    return mentions_anchor_text(''.join(char['text'] for char in chars))
+
+
+def mentions_anchor_text(text):
+    # Labels may wrap onto a second line ('Data \r\nCenter'), so whitespace is ignored
+    text = ''.join(text.lower().split())
+    return all(label.replace(' ', '') in text for label in ANCHOR_LABELS)
+
+
+def has_anchor_labels(table):
+    labels = {(row[0] or '').lower() for row in table or [] if row}
+    return all(label in labels for label in ANCHOR_LABELS)
+
+
+def extract_data_from_pdfs(pdf_paths, max_workers=None, chunksize=1, cache=None, use_templates=False,
+                           backend='auto', executor=None, template_dir=None):
+    sources = ((pdf_path, pdf_path) for pdf_path in pdf_paths)
+    return _extract_sources(sources, max_workers, chunksize, cache, use_templates, backend, executor, template_dir)
+
+
+def extract_data_from_archive(archive_path, max_workers=None, chunksize=1, cache=None, use_templates=False,
+                              backend='auto', executor=None, template_dir=None):
+    # Members are parsed from memory and reported as '<archive>/<member>'
+    sources = ((os.path.join(archive_path, name), pdf) for name, pdf in iter_archive_pdfs(archive_path))
+    return _extract_sources(sources, max_workers, chunksize, cache, use_templates, backend, executor, template_dir)
+
+
+def extract_data_from_pdf_cached(pdf_path, cache=None, use_templates=False, backend='auto', template_dir=None):
+    # A single PDF, served from the cache when its content has been parsed before
+    results = _extract_sources([(None, pdf_path)], 1, 1, cache, use_templates, backend, None, template_dir)
+    return results[None]
+
+
+def _extract_sources(sources, max_workers, chunksize, cache, use_templates, backend, executor, template_dir):
+    results = {}
+    keys = {}
+    first = {}
+    parsed = _extract_all(_uncached_sources(sources, cache, results, keys, first), max_workers, chunksize,
+                          use_templates, backend, executor, template_dir)
+
+    # PDFs repeated within the batch were parsed once, under the first name they appeared with
+    for name, data in results.items():
+        if data is None:
+            results[name] = parsed.get(first.get(keys.get(name, name)))
+
+    if cache is not None:
+        for name, data in parsed.items():
+            if data and name in keys:
+                cache.put(keys[name], data.to_dict())
+
+    return results
+
+
+def _uncached_sources(sources, cache, results, keys, first):
+    # Yield the sources that still need parsing as they arrive, serving byte-identical PDFs from the cache
+    for name, source in sources:
+        results[name] = None
+        if cache is not None:
+            try:
+                keys[name] = cache.key(source)
+            except OSError:
+                pass
+            else:
+                cached = cache.get(keys[name])
+                if cached:
+                    results[name] = RevenueData.from_dict(cached)
+                    continue
+        elif not is_path(source):
+            # In-memory PDFs are hashed even without a cache, so repeats within the batch are still parsed once
+            keys[name] = content_key(source)
+        key = keys.get(name, name)
+        if key not in first:
+            first[key] = name
+            yield name, source
+
+
+def _extract_all(sources, max_workers, chunksize, use_templates, backend, executor, template_dir):
+    extract = partial(extract_data_from_pdf, use_templates=use_templates, backend=backend, template_dir=template_dir)
+
+    # Long-running callers pass in a pool that is already warm
+    if executor is not None:
+        return _extract_windowed(sources, extract, executor, max_workers, chunksize)
+
+    # A pool only pays for itself when there is more than one PDF to parse
+    head = list(islice(sources, 2))
+    if max_workers == 1 or len(head) <= 1:
+        return {name: extract(source) for name, source in chain(head, sources)}
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return _extract_windowed(chain(head, sources), extract, executor, max_workers, chunksize)
+
+
+def _extract_windowed(sources, extract, executor, max_workers, chunksize):
+    # Submit sources as they are read, with a couple of batches per worker in flight: archive members are parsed
+    # while the rest are still being decompressed, and only the PDFs in flight are held in memory
+    window = 2 * (max_workers or os.cpu_count() or 1)
+    in_flight = deque()
+    results = {}
+    while batch := list(islice(sources, chunksize)):
+        if len(in_flight) >= window:
+            _collect(in_flight.popleft(), results)
+        names = [name for name, _ in batch]
+        in_flight.append((names, executor.submit(_extract_batch, extract, [source for _, source in batch])))
+        del batch
+    while in_flight:
+        _collect(in_flight.popleft(), results)
+    return results
+
+
+def _extract_batch(extract, sources):
+    return [extract(source) for source in sources]
+
+
+def _collect(submitted, results):
+    names, future = submitted
+    results.update(zip(names, future.result()))
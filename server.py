@@ -0,0 +1,290 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import uuid
+from collections import OrderedDict
+from typing import NamedTuple
+from urllib.parse import urlsplit
+
+import numpy as np
+
+import read_pdf
+from utils import chart
+from utils.growth_rates import format_growth_rate, quarter_over_quarter, year_over_year
+
+CONTENT_TYPES = {'png': 'image/png', 'svg': 'image/svg+xml', 'pdf': 'application/pdf', 'webp': 'image/webp'}
+REASONS = {200: 'OK', 202: 'Accepted', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+           405: 'Method Not Allowed', 413: 'Content Too Large', 503: 'Service Unavailable'}
+MAX_HEADER_LINES = 100
+MAX_BODY_BYTES = 1024 * 1024
+MAX_UPLOAD_BYTES = 32 * 1024 * 1024
+
+
+class Response(NamedTuple):
+    status: int
+    body: bytes
+    content_type: str = 'application/json'
+    etag: str | None = None
+    headers: tuple[tuple[str, str], ...] = ()
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    query: str
+    headers: dict[str, str]
+    body: bytes
+
+
+def json_response(payload, status: int = 200) -> Response:
+    return cached_response(json.dumps(payload).encode(), 'application/json', status)
+
+
+def cached_response(body: bytes, content_type: str, status: int = 200) -> Response:
+    # Strong validator derived from the bytes, so clients can revalidate with If-None-Match
+    return Response(status, body, content_type, f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def error_response(status: int, message: str) -> Response:
+    return Response(status, json.dumps({'error': message}).encode())
+
+
+def rates_to_json(rates) -> list[float | None]:
+    return [None if np.isnan(rate) else round(float(rate), 4) for rate in rates]
+
+
+class ExtractionJobs:
+    def __init__(self, executor, max_queued: int = 16, concurrency: int | None = None, max_finished: int = 1000,
+                 extract=read_pdf.extract_data_from_pdf):
+        self.executor = executor
+        # Runs in the executor, so it has to pickle for a process pool: a module-level function or a partial of one
+        self.extract = extract
+        self.queue = asyncio.Queue(maxsize=max_queued)
+        self.concurrency = concurrency or os.cpu_count() or 1
+        self.max_finished = max_finished
+        self.jobs = OrderedDict()
+        self._workers = []
+
+    def start(self) -> None:
+        self._workers = [asyncio.create_task(self._work()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    def submit(self, body: bytes) -> dict | None:
+        # Refuse new work instead of buffering without bound when the queue is full
+        job = {'id': uuid.uuid4().hex, 'status': 'queued', 'result': None, 'error': None}
+        try:
+            self.queue.put_nowait((job, body))
+        except asyncio.QueueFull:
+            return None
+        self.jobs[job['id']] = job
+        self._forget_finished()
+        return job
+
+    def get(self, job_id: str) -> dict | None:
+        return self.jobs.get(job_id)
+
+    async def _work(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            job, body = await self.queue.get()
+            job['status'] = 'running'
+            try:
+                data = await loop.run_in_executor(self.executor, self.extract, body)
+            except Exception as error:
+                job.update(status='failed', error=str(error))
+            else:
+                if data:
+                    job.update(status='done', result=data.to_dict())
+                else:
+                    job.update(status='failed', error='No revenue table could be extracted.')
+            finally:
+                self.queue.task_done()
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self.jobs.items() if job['status'] in ('done', 'failed')]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self.jobs[job_id]
+
+
+class RevenueServer:
+    def __init__(self, data=None, formats: tuple[str, ...] = ('png', 'svg'), dpi: float | None = None,
+                 jobs: ExtractionJobs | None = None):
+        self.formats = formats
+        self.dpi = dpi
+        self.jobs = jobs
+        self.responses = {}
+        if data is not None:
+            self.update(data)
+
+    def update(self, data) -> None:
+        # Everything a client can ask for is built up front, so requests never parse PDFs or plot
+        responses = {'/series': json_response(data.to_dict())}
+        for segment in data.segments:
+            missing = data.missing[data.segment_index(segment)]
+            responses[f'/series/{segment}'] = json_response({
+                'quarters': data.quarters,
+                'values': [None if gap else value for value, gap in zip(data[segment].tolist(), missing)]})
+
+        qoq = quarter_over_quarter(data.float_values())
+        yoy = year_over_year(data.float_values())
+        responses['/growth'] = json_response({
+            'quarters': data.quarters,
+            'qoq': {segment: rates_to_json(rates) for segment, rates in zip(data.segments, qoq)},
+            'yoy': {segment: rates_to_json(rates) for segment, rates in zip(data.segments, yoy)},
+        })
+
+        if self.formats:
+            growth_rates = [format_growth_rate(rate) for rate in qoq[data.segment_index('total')]]
+            for fmt, body in render_charts(data, growth_rates, self.formats, self.dpi).items():
+                responses[f'/chart.{fmt}'] = cached_response(body, CONTENT_TYPES[fmt])
+        self.responses = responses
+
+    def route(self, request: Request) -> Response:
+        path = request.path.rstrip('/') or '/'
+        if self.jobs is not None and (path == '/jobs' or path.startswith('/jobs/')):
+            return self.route_jobs(request, path)
+
+        if request.method not in ('GET', 'HEAD'):
+            return error_response(405, f'{request.method} is not supported.')
+        response = self.responses.get(path)
+        if response is None:
+            return error_response(404, f"No resource at '{request.path}'.")
+        return response
+
+    def route_jobs(self, request: Request, path: str) -> Response:
+        if path == '/jobs':
+            if request.method != 'POST':
+                return error_response(405, 'Upload PDFs with POST /jobs.')
+            if not request.body.startswith(b'%PDF'):
+                return error_response(400, 'The request body is not a PDF.')
+            job = self.jobs.submit(request.body)
+            if job is None:
+                return Response(503, json.dumps({'error': 'The extraction queue is full.'}).encode(),
+                                headers=(('Retry-After', '1'),))
+            return Response(202, json.dumps(job).encode(), headers=(('Location', f'/jobs/{job["id"]}'),))
+
+        if request.method not in ('GET', 'HEAD'):
+            return error_response(405, f'{request.method} is not supported.')
+        job = self.jobs.get(path.removeprefix('/jobs/'))
+        if job is None:
+            return error_response(404, f"No job at '{request.path}'.")
+        return Response(200, json.dumps(job).encode())
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        max_body_bytes = MAX_UPLOAD_BYTES if self.jobs is not None else MAX_BODY_BYTES
+        try:
+            while True:
+                try:
+                    request = await read_request(reader, max_body_bytes)
+                except ValueError as error:
+                    await write_response(writer, error_response(400, str(error)), keep_alive=False)
+                    break
+                except OverflowError as error:
+                    await write_response(writer, error_response(413, str(error)), keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                response = await self.respond(request)
+                if response.etag and response.etag in request.headers.get('if-none-match', ''):
+                    response = Response(304, b'', response.content_type, response.etag, response.headers)
+
+                keep_alive = request.headers.get('connection', '').lower() != 'close'
+                await write_response(writer, response, keep_alive, head=request.method == 'HEAD')
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def respond(self, request: Request) -> Response:
+        return self.route(request)
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.Server:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+def render_charts(data, growth_rates: list[str], formats: tuple[str, ...], dpi: float | None) -> dict[str, bytes]:
+    # Draw once and encode the same figure in every format
+    chart.use_headless_backend(force=True)
+    fig, ax = chart.create_figure()
+    chart.draw_chart(fig, ax, data, growth_rates)
+
+    rendered = {}
+    for fmt in formats:
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format=fmt, dpi=dpi or 'figure')
+        rendered[fmt] = buffer.getvalue()
+
+    import matplotlib.pyplot as plt
+    plt.close(fig)
+    return rendered
+
+
+async def read_request(reader: asyncio.StreamReader, max_body_bytes: int = MAX_BODY_BYTES) -> Request | None:
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').split()
+    except ValueError:
+        raise ValueError('Malformed request line.')
+
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = (await reader.readline()).decode('latin-1').rstrip('\r\n')
+        if not line:
+            break
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise ValueError('Too many headers.')
+
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise ValueError('Invalid Content-Length.')
+    if length > max_body_bytes:
+        raise OverflowError(f'Request bodies are limited to {max_body_bytes} bytes.')
+    body = await reader.readexactly(length) if length else b''
+
+    url = urlsplit(target)
+    return Request(method.upper(), url.path, url.query, headers, body)
+
+
+async def write_response(writer: asyncio.StreamWriter, response: Response, keep_alive: bool = True,
+                         head: bool = False) -> None:
+    lines = [f'HTTP/1.1 {response.status} {REASONS.get(response.status, "")}',
+             f'Content-Type: {response.content_type}',
+             f'Content-Length: {len(response.body)}',
+             'Cache-Control: no-cache',
+             f'Connection: {"keep-alive" if keep_alive else "close"}']
+    if response.etag:
+        lines.append(f'ETag: {response.etag}')
+    lines.extend(f'{name}: {value}' for name, value in response.headers)
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    if not head and response.status != 304:
+        writer.write(response.body)
+    await writer.drain()
+
+
+async def serve_forever(server: RevenueServer, host: str, port: int) -> None:
+    listener = await server.serve(host, port)
+    addresses = ', '.join(f'http://{sock.getsockname()[0]}:{sock.getsockname()[1]}' for sock in listener.sockets)
+    print(f'Serving revenue data on {addresses}')
+    if server.jobs is not None:
+        server.jobs.start()
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        if server.jobs is not None:
+            await server.jobs.stop()
@@ -0,0 +1,31 @@
+import io
+import tarfile
+import zipfile
+
+from utils.archives import is_archive, iter_archive_pdfs
+
+
+def test_reads_pdfs_from_zip(tmp_path):
+    archive_path = tmp_path / 'filings.zip'
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr('Q3/trend.PDF', b'%PDF-1.4 three')
+        archive.writestr('Q3/notes.txt', b'notes')
+        archive.writestr('Q4/', b'')
+
+    assert list(iter_archive_pdfs(str(archive_path))) == [('Q3/trend.PDF', b'%PDF-1.4 three')]
+
+
+def test_streams_pdfs_from_compressed_tar(tmp_path):
+    archive_path = tmp_path / 'filings.tar.gz'
+    with tarfile.open(archive_path, 'w:gz') as archive:
+        for name, body in (('a.pdf', b'%PDF-1.4 a'), ('readme.md', b'#'), ('b.pdf', b'%PDF-1.4 b')):
+            info = tarfile.TarInfo(name)
+            info.size = len(body)
+            archive.addfile(info, io.BytesIO(body))
+
+    assert list(iter_archive_pdfs(str(archive_path))) == [('a.pdf', b'%PDF-1.4 a'), ('b.pdf', b'%PDF-1.4 b')]
+
+
+def test_is_archive():
+    assert is_archive('filings.ZIP') and is_archive('filings.tar.gz') and is_archive('filings.tgz')
+    assert not is_archive('trend.pdf')
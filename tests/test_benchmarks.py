@@ -0,0 +1,17 @@
+from benchmarks.run import collect_benchmarks, compare
+
+
+def test_collects_every_stage():
+    names = collect_benchmarks()
+
+    assert 'bench_extraction.bench_extract_auto' in names
+    assert 'bench_labels.bench_replace_text' in names
+    assert 'bench_growth.bench_quarter_over_quarter' in names
+    assert 'bench_render.bench_render_png' in names
+
+
+def test_compare_flags_only_regressions_beyond_threshold():
+    baseline = {'extract': 1.0, 'render': 2.0, 'removed': 1.0}
+    results = {'extract': 1.2, 'render': 2.6, 'new': 5.0}
+
+    assert compare(results, baseline, threshold=0.25) == ['render']
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from utils.binary_series import load_binary, write_binary
+from utils.revenue_data import RevenueData
+
+
+def test_round_trip_maps_matrix_from_file(tmp_path):
+    path = str(tmp_path / 'revenue.bin')
+    data = RevenueData(['Q2 FY25', 'Q3 FY25'], ['data_center', 'total'], [[26272, 30771], [30040, 35082]])
+
+    write_binary(data, path)
+    loaded = load_binary(path)
+
+    assert loaded == data
+    assert isinstance(loaded.values.base, np.memmap)
+    assert loaded['total'].tolist() == [30040, 35082]
+
+
+def test_round_trip_keeps_missing_cells(tmp_path):
+    path = str(tmp_path / 'revenue.bin')
+    data = RevenueData(['Q1 FY25', 'Q2 FY25', 'Q3 FY25'], ['auto', 'total'], [[0, 346, 449], [26044, 30040, 0]],
+                       missing=[[True, False, False], [False, False, True]])
+
+    write_binary(data, path)
+    loaded = load_binary(path)
+
+    assert loaded == data
+    assert loaded.missing.tolist() == [[True, False, False], [False, False, True]]
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'other.bin'
+    path.write_bytes(b'\0' * 64)
+
+    with pytest.raises(ValueError):
+        load_binary(str(path))
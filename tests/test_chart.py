@@ -0,0 +1,35 @@
+from utils.chart import chart_fingerprint, is_up_to_date, output_paths, write_fingerprint
+from utils.revenue_data import RevenueData
+
+
+def test_output_paths_follow_output_suffix():
+    assert output_paths('charts/trend.svg') == ['charts/trend.svg']
+    assert output_paths('trend') == ['trend.png']
+
+
+def test_output_paths_for_several_formats():
+    assert output_paths('trend.png', ['png', 'svg', 'png', 'webp']) == ['trend.png', 'trend.svg', 'trend.webp']
+
+
+def test_is_up_to_date_only_for_matching_fingerprint(tmp_path):
+    data = RevenueData(['Q3 FY25'], ['total'], [[35082]])
+    output = str(tmp_path / 'trend.png')
+    fingerprint = chart_fingerprint(data)
+
+    assert not is_up_to_date(fingerprint, output)
+
+    (tmp_path / 'trend.png').touch()
+    write_fingerprint(fingerprint, output)
+    assert is_up_to_date(fingerprint, output)
+
+    # Different data or render settings need a new chart
+    assert not is_up_to_date(chart_fingerprint(RevenueData(['Q3 FY25'], ['total'], [[1]])), output)
+    assert not is_up_to_date(chart_fingerprint(data, dpi=200), output)
+
+
+def test_fingerprint_changes_with_chart_version(monkeypatch):
+    data = RevenueData(['Q3 FY25'], ['total'], [[35082]])
+    fingerprint = chart_fingerprint(data)
+
+    monkeypatch.setattr('utils.chart.CHART_VERSION', 'next')
+    assert chart_fingerprint(data) != fingerprint
@@ -0,0 +1,54 @@
+import io
+import os
+
+from utils.extraction_cache import ExtractionCache
+
+
+def test_key_depends_on_content_and_version(tmp_path):
+    pdf_path = tmp_path / 'a.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4 one')
+    cache = ExtractionCache(str(tmp_path / 'cache'), version='1')
+
+    key = cache.key(str(pdf_path))
+    assert key == ExtractionCache(str(tmp_path / 'cache'), version='1').key(str(pdf_path))
+    assert key != ExtractionCache(str(tmp_path / 'cache'), version='2').key(str(pdf_path))
+
+    pdf_path.write_bytes(b'%PDF-1.4 two')
+    assert cache.key(str(pdf_path)) != key
+
+
+def test_key_is_the_same_for_paths_buffers_and_streams(tmp_path):
+    pdf_path = tmp_path / 'a.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4 one')
+    cache = ExtractionCache(str(tmp_path / 'cache'))
+
+    stream = io.BytesIO(b'%PDF-1.4 one')
+    stream.seek(3)
+    key = cache.key(pdf_path)
+    assert cache.key(b'%PDF-1.4 one') == cache.key(memoryview(b'%PDF-1.4 one')) == cache.key(stream) == key
+    assert stream.tell() == 0
+
+
+def test_put_get_and_clear(tmp_path):
+    cache = ExtractionCache(str(tmp_path))
+    data = {'quarters': ['Q1 FY25'], 'total': [26044]}
+
+    assert cache.get('abc') is None
+    cache.put('abc', data)
+    assert cache.get('abc') == data
+
+    cache.clear()
+    assert cache.get('abc') is None
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ExtractionCache(str(tmp_path), max_bytes=10_000)
+    cache.put('old', {'total': [1]})
+    cache.put('new', {'total': [2]})
+    os.utime(tmp_path / 'old.json', (0, 0))
+
+    cache.max_bytes = os.path.getsize(tmp_path / 'new.json')
+    cache.evict()
+
+    assert cache.get('old') is None
+    assert cache.get('new') == {'total': [2]}
@@ -0,0 +1,21 @@
+from utils.files import atomic_write, json_entries, remove_json_files
+
+
+def test_atomic_write_leaves_only_the_finished_file(tmp_path):
+    path = str(tmp_path / 'entry.json')
+
+    with atomic_write(path) as output:
+        output.write('{}')
+
+    assert [entry.name for entry in tmp_path.iterdir()] == ['entry.json']
+
+
+def test_remove_json_files_keeps_other_files(tmp_path):
+    (tmp_path / 'a.json').write_text('{}')
+    (tmp_path / 'notes.txt').write_text('')
+
+    remove_json_files(str(tmp_path))
+
+    assert json_entries(str(tmp_path)) == []
+    assert (tmp_path / 'notes.txt').exists()
+    remove_json_files(str(tmp_path / 'missing'))
@@ -0,0 +1,28 @@
+import numpy as np
+
+from utils.growth_rates import format_growth_rate, growth_rates, quarter_over_quarter, year_over_year
+
+
+def test_quarter_over_quarter_for_every_row():
+    rates = quarter_over_quarter([[100, 150, 120], [0, 10, 20]])
+
+    assert np.isnan(rates[:, 0]).all()
+    assert np.allclose(rates[0, 1:], [50.0, -20.0])
+    # A zero denominator gives NaN instead of raising
+    assert np.isnan(rates[1, 1])
+    assert rates[1, 2] == 100.0
+
+
+def test_year_over_year_and_arbitrary_lag():
+    values = np.arange(1, 7)
+
+    assert np.isnan(year_over_year(values)[:4]).all()
+    assert np.allclose(year_over_year(values)[4:], [400.0, 200.0])
+    assert np.isnan(growth_rates(values, lag=6)).all()
+
+
+def test_format_growth_rate():
+    assert format_growth_rate(18.857) == '+18.86%'
+    assert format_growth_rate(-7.5) == '-7.50%'
+    assert format_growth_rate(np.nan) == '0.00%'
+    assert format_growth_rate(np.nan, missing='n/a') == 'n/a'
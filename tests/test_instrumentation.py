@@ -0,0 +1,39 @@
+from utils.instrumentation import METRIC_PREFIX, stage, start_recording, stop_recording
+
+
+def test_records_nested_and_repeated_stages():
+    recorder = start_recording()
+    try:
+        with stage('extract'):
+            for _ in range(2):
+                with stage('parse'):
+                    buffer = bytearray(1_000_000)
+                    del buffer
+    finally:
+        stop_recording()
+
+    assert recorder.stages['parse']['calls'] == 2
+    assert recorder.stages['extract']['calls'] == 1
+    assert recorder.stages['extract']['wall_seconds'] >= recorder.stages['parse']['wall_seconds']
+    # The outer stage sees the peak reached inside the inner one
+    assert recorder.stages['parse']['peak_memory_bytes'] >= 1_000_000
+    assert recorder.stages['extract']['peak_memory_bytes'] >= recorder.stages['parse']['peak_memory_bytes']
+
+
+def test_prometheus_output():
+    recorder = start_recording(trace_memory=False)
+    with stage('growth'):
+        pass
+    stop_recording()
+
+    lines = recorder.to_prometheus().splitlines()
+    assert f'# TYPE {METRIC_PREFIX}_wall_seconds gauge' in lines
+    assert f'{METRIC_PREFIX}_calls{{stage="growth"}} 1' in lines
+    # Memory was not traced, so no peak is reported at all
+    assert 'peak_memory_bytes' not in recorder.stages['growth']
+    assert not any('peak_memory_bytes' in line for line in lines)
+
+
+def test_stage_is_a_no_op_without_recording():
+    with stage('extract'):
+        pass
@@ -0,0 +1,80 @@
+import subprocess
+import sys
+from pathlib import Path
+
+import read_pdf
+from main import collect_pdf_paths, main, parse_args
+from utils.revenue_data import RevenueData
+
+ROOT = Path(__file__).parent.parent
+PDF_PATH = str(ROOT / 'Rev_by_Mkt_Qtrly_Trend_Q325.pdf')
+
+
+def test_collect_pdf_paths_expands_directory(tmp_path):
+    (tmp_path / 'b.pdf').touch()
+    (tmp_path / 'a.pdf').touch()
+    (tmp_path / 'notes.txt').touch()
+
+    assert collect_pdf_paths([str(tmp_path)]) == [str(tmp_path / 'a.pdf'), str(tmp_path / 'b.pdf')]
+
+
+def test_collect_pdf_paths_expands_glob_and_deduplicates(tmp_path):
+    (tmp_path / 'Q1.pdf').touch()
+    (tmp_path / 'Q2.pdf').touch()
+    first = str(tmp_path / 'Q1.pdf')
+
+    assert collect_pdf_paths([first, str(tmp_path / 'Q*.pdf')]) == [first, str(tmp_path / 'Q2.pdf')]
+
+
+def test_parse_args_defaults_to_plot():
+    assert parse_args(['report.pdf']).command == 'plot'
+    assert parse_args(['extract', 'report.pdf', '--no-cache']).command == 'extract'
+
+
+def test_extraction_does_not_import_matplotlib():
+    code = "import sys, main; main.main(['extract', sys.argv[1], '--no-cache']); print('matplotlib' in sys.modules)"
+    result = subprocess.run([sys.executable, '-c', code, PDF_PATH], cwd=ROOT, capture_output=True, text=True)
+
+    assert result.returncode == 0
+    assert result.stdout.splitlines()[-1] == 'False'
+
+
+def test_batch_rerun_with_unchanged_data_skips_rendering(tmp_path, monkeypatch, capsys):
+    datasets = {'a.pdf': RevenueData(['Q2 FY25', 'Q3 FY25'], ['total'], [[30040, 35082]]),
+                'b.pdf': RevenueData(['Q3 FY25', 'Q4 FY25'], ['total'], [[35082, 39331]])}
+    monkeypatch.setattr(read_pdf, 'extract_data_from_pdfs', lambda paths, **kwargs: dict(datasets))
+    args = ['plot', 'a.pdf', 'b.pdf', '--no-show', '--no-cache', '--output', str(tmp_path / 'chart.svg')]
+
+    assert main(args) == 0
+    assert 'up to date' not in capsys.readouterr().out
+    assert main(args) == 0
+    assert "Chart for 'b.pdf' is up to date." in capsys.readouterr().out
+
+
+def test_store_skips_pdfs_with_unrecognised_quarters(tmp_path, monkeypatch, capsys):
+    datasets = {'annual.pdf': RevenueData(['FY2025'], ['total'], [[130497]]),
+                'q3.pdf': RevenueData(['Q2 FY25', 'Q3 FY25'], ['total'], [[30040, 35082]])}
+    monkeypatch.setattr(read_pdf, 'extract_data_from_pdfs', lambda paths, **kwargs: dict(datasets))
+
+    assert main(['extract', 'annual.pdf', 'q3.pdf', '--no-cache', '--store', str(tmp_path / 'revenue.sqlite')]) == 1
+    output = capsys.readouterr().out
+    assert "Skipping 'annual.pdf': Unrecognised quarter 'FY2025'." in output
+    assert '35082' in output
+
+
+def test_watch_rejects_missing_directory(tmp_path, capsys):
+    missing = str(tmp_path / 'missing')
+
+    assert main(['watch', missing, '--store', str(tmp_path / 'revenue.sqlite'), '--no-cache']) == 1
+    assert f"Error: The directory '{missing}' was not found." in capsys.readouterr().out
+
+
+def test_unreadable_archive_is_reported_and_skipped(monkeypatch, capsys):
+    def encrypted(path, **kwargs):
+        raise RuntimeError('File is encrypted, password required for extraction')
+
+    monkeypatch.setattr(read_pdf, 'extract_data_from_pdfs', lambda paths, **kwargs: {})
+    monkeypatch.setattr(read_pdf, 'extract_data_from_archive', encrypted)
+
+    assert main(['extract', 'filings.zip', '--no-cache']) == 1
+    assert "Error reading the archive 'filings.zip': File is encrypted" in capsys.readouterr().out
@@ -0,0 +1,16 @@
+from utils.normalize_label import normalize_label
+
+
+def test_collapses_non_alphanumeric_runs():
+    assert normalize_label('Data Center') == 'data_center'
+    assert normalize_label('OEM & Other') == 'oem_other'
+    assert normalize_label('Professional\nVisualization') == 'professional_visualization'
+    assert normalize_label('Data__Visualisation') == 'data_visualisation'
+    assert normalize_label('($ in millions)') == 'in_millions'
+
+
+def test_maps_aliases_to_canonical_segments():
+    assert normalize_label('Automotive') == 'auto'
+    assert normalize_label('OEM & IP') == 'oem_other'
+    assert normalize_label('Total Revenue') == 'total'
+    assert normalize_label('TOTAL') == 'total'
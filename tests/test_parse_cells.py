@@ -0,0 +1,26 @@
+import numpy as np
+import pytest
+
+from utils.parse_cells import parse_cells
+
+
+def test_parses_accounting_formats():
+    values, missing = parse_cells([['$30,771', '(1,200)', '\u2014'], ['97', '', None]], 3)
+
+    assert values.dtype == np.int64
+    assert values.tolist() == [[30771, -1200, 0], [97, 0, 0]]
+    assert missing.tolist() == [[False, False, True], [False, True, True]]
+
+
+def test_pads_short_rows_as_missing():
+    values, missing = parse_cells([['1'], ['2', '3']], 2)
+
+    assert values.tolist() == [[1, 0], [2, 3]]
+    assert missing.tolist() == [[False, True], [False, False]]
+
+
+def test_rejects_text_and_overlong_rows():
+    with pytest.raises(ValueError):
+        parse_cells([['12a']], 1)
+    with pytest.raises(ValueError):
+        parse_cells([['1', '2']], 1)
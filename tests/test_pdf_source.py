@@ -0,0 +1,32 @@
+import io
+import mmap
+from pathlib import Path
+
+import pytest
+
+from read_pdf import extract_data_from_pdf
+from utils.pdf_source import BufferReader
+
+PDF_PATH = Path(__file__).parent.parent / 'Rev_by_Mkt_Qtrly_Trend_Q325.pdf'
+
+
+def test_buffer_reader_reads_and_seeks_without_copying():
+    buffer = bytearray(b'%PDF-1.4 body')
+    reader = BufferReader(buffer)
+
+    assert reader.read(4) == b'%PDF'
+    reader.seek(-4, io.SEEK_END)
+    assert reader.read() == b'body'
+    buffer[-4:] = b'BODY'
+    reader.seek(9)
+    assert reader.read() == b'BODY'
+
+
+@pytest.mark.parametrize('backend', ['pdfium', 'pdfplumber'])
+def test_extracts_from_memory_and_file_objects(backend):
+    expected = extract_data_from_pdf(str(PDF_PATH), backend=backend)
+    raw = PDF_PATH.read_bytes()
+
+    with open(PDF_PATH, 'rb') as pdf_file, mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for source in (raw, memoryview(raw), mapped, pdf_file):
+            assert extract_data_from_pdf(source, backend=backend) == expected
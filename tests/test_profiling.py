@@ -0,0 +1,26 @@
+import pstats
+import time
+
+from utils.profiling import collapsed_path, profile
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_profile_writes_pstats_and_collapsed_stacks(tmp_path):
+    path = str(tmp_path / 'run.pstats')
+
+    with profile(path):
+        busy_wait(0.1)
+
+    assert collapsed_path(path) == str(tmp_path / 'run.collapsed')
+    assert any(function == 'busy_wait' for _, _, function in pstats.Stats(path).stats)
+
+    with open(collapsed_path(path)) as collapsed:
+        lines = collapsed.read().splitlines()
+    assert lines
+    stack, count = lines[0].rsplit(' ', 1)
+    assert 'busy_wait' in stack and int(count) > 0
@@ -0,0 +1,211 @@
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pdfplumber
+import pypdfium2 as pdfium
+
+import read_pdf
+
+from read_pdf import (PARSER_VERSION, extract_data_from_archive, extract_data_from_pdf, extract_data_from_pdfs,
+                      is_valid_table, iter_revenue_tables, mentions_anchor_labels, mentions_anchor_text)
+from utils.extraction_cache import ExtractionCache
+from utils.revenue_data import RevenueData
+
+PDF_PATH = str(Path(__file__).parent.parent / 'Rev_by_Mkt_Qtrly_Trend_Q325.pdf')
+
+
+def test_extract_data_from_pdf():
+    data = extract_data_from_pdf(PDF_PATH)
+
+    assert data.quarters[0] == 'Q4 FY23'
+    assert data.quarters[-1] == 'Q3 FY25'
+    assert data.segments == ['data_center', 'gaming', 'professional_visualization', 'auto', 'oem_other', 'total']
+    assert data['data_center'][-1] == 30771
+    assert data['total'].tolist() == [6051, 7192, 13507, 18120, 22103, 26044, 30040, 35082]
+
+
+def test_extract_data_from_pdfs_in_parallel(tmp_path):
+    copy_path = str(tmp_path / 'copy.pdf')
+    Path(copy_path).write_bytes(Path(PDF_PATH).read_bytes())
+
+    results = extract_data_from_pdfs([PDF_PATH, copy_path], max_workers=2)
+
+    assert list(results) == [PDF_PATH, copy_path]
+    assert results[PDF_PATH] == results[copy_path] == extract_data_from_pdf(PDF_PATH)
+
+
+def test_extract_data_from_pdfs_uses_cache(tmp_path):
+    cache = ExtractionCache(str(tmp_path), version=PARSER_VERSION)
+    cached = RevenueData(['Q3 FY25'], ['total'], [[1]])
+    cache.put(cache.key(PDF_PATH), cached.to_dict())
+
+    assert extract_data_from_pdfs([PDF_PATH], cache=cache) == {PDF_PATH: cached}
+
+
+def test_extract_data_from_pdf_cached_serves_known_uploads(tmp_path):
+    cache = ExtractionCache(str(tmp_path), version=PARSER_VERSION)
+    body = Path(PDF_PATH).read_bytes()
+    cached = RevenueData(['Q3 FY25'], ['total'], [[1]])
+    cache.put(cache.key(body), cached.to_dict())
+
+    assert read_pdf.extract_data_from_pdf_cached(body, cache=cache) == cached
+    assert read_pdf.extract_data_from_pdf_cached(body, backend='pdfium') == extract_data_from_pdf(PDF_PATH)
+
+
+def test_extract_data_from_archive_skips_known_pdfs(tmp_path, monkeypatch):
+    archive_path = str(tmp_path / 'filings.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.write(PDF_PATH, 'Q3/trend.pdf')
+        archive.write(PDF_PATH, 'copy/trend.pdf')
+    cache = ExtractionCache(str(tmp_path / 'cache'), version=PARSER_VERSION)
+    expected = extract_data_from_pdf(PDF_PATH)
+
+    results = extract_data_from_archive(archive_path, max_workers=1, cache=cache)
+    assert results == {f'{archive_path}/Q3/trend.pdf': expected, f'{archive_path}/copy/trend.pdf': expected}
+    assert len(list((tmp_path / 'cache').iterdir())) == 1
+
+    # Members whose content hash is already cached are never parsed again
+    monkeypatch.setattr(read_pdf, 'extract_data_from_pdf', lambda *args, **kwargs: None)
+    assert extract_data_from_archive(archive_path, max_workers=1, cache=cache) == results
+
+
+def test_extract_data_from_archive_parses_identical_members_once_without_cache(tmp_path, monkeypatch):
+    archive_path = str(tmp_path / 'filings.zip')
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.write(PDF_PATH, 'Q3/trend.pdf')
+        archive.write(PDF_PATH, 'copy/trend.pdf')
+    parsed = []
+    monkeypatch.setattr(read_pdf, 'extract_data_from_pdf', lambda source, **kwargs: parsed.append(source) or 'data')
+
+    results = extract_data_from_archive(archive_path, max_workers=1)
+
+    assert results == {f'{archive_path}/Q3/trend.pdf': 'data', f'{archive_path}/copy/trend.pdf': 'data'}
+    assert len(parsed) == 1
+
+
+def test_extract_data_from_pdfs_parses_while_reading_with_bounded_work_in_flight(monkeypatch):
+    events = []
+
+    def paths():
+        for index in range(8):
+            events.append(('read', index))
+            yield f'{index}.pdf'
+
+    def extract(source, **kwargs):
+        events.append(('parse', int(source[:-4])))
+        return source
+
+    monkeypatch.setattr(read_pdf, 'extract_data_from_pdf', extract)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        results = extract_data_from_pdfs(paths(), max_workers=1, executor=executor)
+
+    assert results == {f'{index}.pdf': f'{index}.pdf' for index in range(8)}
+    # With one worker, at most two sources are in flight before the oldest has to be parsed
+    assert events.index(('parse', 0)) < events.index(('read', 3))
+
+
+def test_learned_template_is_reused_by_a_fresh_process(tmp_path, monkeypatch):
+    expected = extract_data_from_pdf(PDF_PATH, backend='pdfplumber')
+    monkeypatch.setattr(read_pdf, '_table_templates', {})
+    assert extract_data_from_pdf(PDF_PATH, True, 'pdfplumber', str(tmp_path)) == expected
+    assert len(list(tmp_path.glob('*.json'))) == 1
+
+    # A new process starts with no templates in memory and must not need table detection
+    monkeypatch.setattr(read_pdf, '_table_templates', {})
+    monkeypatch.setattr(pdfplumber.page.Page, 'find_tables', None)
+    assert extract_data_from_pdf(PDF_PATH, True, 'pdfplumber', str(tmp_path)) == expected
+
+
+def test_extract_data_from_pdf_with_table_templates(monkeypatch):
+    expected = extract_data_from_pdf(PDF_PATH, backend='pdfplumber')
+    monkeypatch.setattr(read_pdf, '_table_templates', {})
+
+    # The first call learns the table grid, the second slices the page into it
+    assert extract_data_from_pdf(PDF_PATH, use_templates=True, backend='pdfplumber') == expected
+    assert len(read_pdf._table_templates) == 1
+    assert extract_data_from_pdf(PDF_PATH, use_templates=True, backend='pdfplumber') == expected
+
+
+def test_extract_data_from_pdf_backends_agree():
+    expected = extract_data_from_pdf(PDF_PATH, backend='pdfplumber')
+
+    assert extract_data_from_pdf(PDF_PATH, backend='pdfium') == expected
+    assert extract_data_from_pdf(PDF_PATH, backend='auto') == expected
+
+
+def test_auto_falls_back_when_pdfium_finds_no_table(monkeypatch):
+    expected = extract_data_from_pdf(PDF_PATH, backend='pdfplumber')
+    monkeypatch.setattr(read_pdf, 'iter_tables_pdfium', lambda pdf_path: iter(()))
+
+    assert extract_data_from_pdf(PDF_PATH, backend='auto') == expected
+    assert extract_data_from_pdf(PDF_PATH, backend='pdfium') is None
+
+
+def test_auto_fallback_keeps_page_order_without_repeating_pages(monkeypatch):
+    valid = [['($ in millions)', 'Q3 FY25'], ['Data Center', '$30,771'], ['TOTAL', '$30,771']]
+    invalid = [['($ in millions)', 'Q3 FY25'], ['Data Center', '$30,771'], ['TOTAL', '$1']]
+
+    def pdfplumber_pages(pdf_path, pages, use_templates, template_dir, skip_pages=frozenset()):
+        return ((number, valid) for number in pages or (1, 2, 3) if number not in skip_pages)
+
+    def pdfium_pages(pdf_path):
+        yield 2, invalid
+        yield 3, valid
+
+    monkeypatch.setattr(read_pdf, 'iter_tables_pdfplumber', pdfplumber_pages)
+    monkeypatch.setattr(read_pdf, 'iter_tables_pdfium', pdfium_pages)
+    # Page 3 is ready first but waits for pdfplumber to re-read page 2
+    assert [number for number, _ in read_pdf.iter_tables(PDF_PATH)] == [2, 3]
+
+    def failing_pdfium_pages(pdf_path):
+        yield 1, valid
+        raise pdfium.PdfiumError('damaged page')
+
+    monkeypatch.setattr(read_pdf, 'iter_tables_pdfium', failing_pdfium_pages)
+    assert [number for number, _ in read_pdf.iter_tables(PDF_PATH)] == [1, 2, 3]
+
+
+def test_anchor_text_ignores_wrapped_labels():
+    assert mentions_anchor_text('Data \r\nCenter  $30,771\r\nTOTAL $35,082')
+    assert not mentions_anchor_text('Gaming 3,279\r\nTOTAL $35,082')
+
+
+def test_is_valid_table_checks_segments_add_up():
+    table = [['($ in millions)', 'Q3 FY25'], ['Data Center', '$30,771'], ['Gaming', '3,279'], ['TOTAL', '$34,050']]
+    assert is_valid_table(table)
+
+    table[-1][1] = '$35,082'
+    assert not is_valid_table(table)
+
+    # A dashed segment counts as nothing, a dashed total cannot be checked
+    table[2][1], table[-1][1] = '\u2014', '$30,771'
+    assert is_valid_table(table)
+    table[-1][1] = '-'
+    assert not is_valid_table(table)
+
+
+def test_mentions_anchor_labels_reads_raw_characters():
+    chars = [{'text': text} for text in 'Data CenterGamingTOTAL']
+    assert mentions_anchor_labels(chars)
+    assert not mentions_anchor_labels(chars[:11])
+
+
+def test_iter_revenue_tables_streams_every_matching_page(tmp_path):
+    # A filing with blank pages around two copies of the revenue table
+    source = pdfium.PdfDocument(PDF_PATH)
+    filing = pdfium.PdfDocument.new()
+    filing.new_page(612, 792)
+    filing.import_pages(source)
+    filing.new_page(612, 792)
+    filing.import_pages(source)
+    filing_path = str(tmp_path / 'filing.pdf')
+    filing.save(filing_path)
+    filing.close()
+    source.close()
+
+    expected = extract_data_from_pdf(PDF_PATH)
+    for backend in ('pdfium', 'pdfplumber'):
+        tables = list(iter_revenue_tables(filing_path, backend=backend))
+        assert [page_number for page_number, _ in tables] == [2, 4]
+        assert all(data == expected for _, data in tables)
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from utils.revenue_data import RevenueData
+
+
+def test_rows_are_views_into_one_matrix():
+    data = RevenueData.from_rows(['Q2 FY25', 'Q3 FY25'], {'gaming': [2880, 3279], 'total': [30040, 35082]})
+
+    assert data.values.dtype == np.int64
+    assert data.values.flags['C_CONTIGUOUS']
+    assert np.shares_memory(data['gaming'], data.values)
+    assert data['total'].tolist() == [30040, 35082]
+    assert data.quarter_index('Q3 FY25') == 1
+    assert 'gaming' in data and 'auto' not in data
+
+
+def test_round_trips_through_dict():
+    data = RevenueData(['Q3 FY25'], ['data_center', 'total'], [[30771], [35082]])
+
+    assert RevenueData.from_dict(data.to_dict()) == data
+
+
+def test_missing_cells_survive_round_trip_and_skip_growth():
+    data = RevenueData(['Q1 FY25', 'Q2 FY25', 'Q3 FY25'], ['total'], [[100, 0, 150]], [[False, True, False]])
+
+    restored = RevenueData.from_dict(data.to_dict())
+    assert restored == data
+    assert restored.fingerprint() != RevenueData(data.quarters, data.segments, data.values).fingerprint()
+    assert np.isnan(data.float_values()[0, 1])
+    assert 'missing' not in RevenueData(['Q3 FY25'], ['total'], [[1]]).to_dict()
+
+
+def test_rejects_mismatched_shape():
+    with pytest.raises(ValueError):
+        RevenueData.from_rows(['Q2 FY25', 'Q3 FY25'], {'gaming': [2880]})
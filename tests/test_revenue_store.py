@@ -0,0 +1,47 @@
+import pytest
+
+from utils.revenue_data import RevenueData, quarter_key
+from utils.revenue_store import RevenueStore
+
+
+def test_quarter_key_orders_chronologically():
+    quarters = ['Q1 FY25', 'Q4 FY23', 'Q4 FY24', 'Q1 FY24']
+
+    assert sorted(quarters, key=quarter_key) == ['Q4 FY23', 'Q1 FY24', 'Q4 FY24', 'Q1 FY25']
+
+
+def test_merges_overlapping_pdfs_and_records_restatements(tmp_path):
+    older = RevenueData(['Q1 FY25', 'Q2 FY25'], ['gaming', 'total'], [[2647, 2880], [26044, 30040]])
+    newer = RevenueData(['Q2 FY25', 'Q3 FY25'], ['gaming', 'total'], [[2881, 3279], [30041, 35082]])
+
+    with RevenueStore(str(tmp_path / 'revenue.sqlite')) as store:
+        assert store.ingest(older, 'Q225.pdf') == 0
+        assert store.ingest(newer, 'Q325.pdf') == 2
+        # Ingesting the same data again changes nothing
+        assert store.ingest(newer, 'copy.pdf') == 0
+
+        data = store.load()
+        assert data.quarters == ['Q1 FY25', 'Q2 FY25', 'Q3 FY25']
+        assert data.segments == ['gaming', 'total']
+        assert data['total'].tolist() == [26044, 30041, 35082]
+        assert store.restatements() == [('Q2 FY25', 'gaming', 2880, 2881, 'Q325.pdf'),
+                                        ('Q2 FY25', 'total', 30040, 30041, 'Q325.pdf')]
+
+
+def test_older_pdf_does_not_override_newer_figures(tmp_path):
+    newer = RevenueData(['Q2 FY25', 'Q3 FY25'], ['total'], [[30041, 35082]])
+    older = RevenueData(['Q1 FY25', 'Q2 FY25'], ['total'], [[26044, 30040]])
+
+    with RevenueStore(str(tmp_path / 'revenue.sqlite')) as store:
+        store.ingest(newer, 'Q325.pdf')
+        assert store.ingest(older, 'Q225.pdf') == 0
+        assert store.load()['total'].tolist() == [26044, 30041, 35082]
+
+
+def test_rejects_unrecognised_quarters_without_storing_anything(tmp_path):
+    data = RevenueData(['Q3 FY25', 'Fiscal 2025'], ['total'], [[35082, 130497]])
+
+    with RevenueStore(str(tmp_path / 'revenue.sqlite')) as store:
+        with pytest.raises(ValueError, match='Fiscal 2025'):
+            store.ingest(data, 'annual.pdf')
+        assert store.load() is None
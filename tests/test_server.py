@@ -0,0 +1,114 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from server import ExtractionJobs, RevenueServer
+from utils.revenue_data import RevenueData
+
+PDF_PATH = Path(__file__).parent.parent / 'Rev_by_Mkt_Qtrly_Trend_Q325.pdf'
+
+DATA = RevenueData(['Q2 FY25', 'Q3 FY25'], ['data_center', 'total'], [[26272, 30771], [30040, 35082]])
+
+
+async def fetch(port, path, headers=(), method='GET', body=b''):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    request = [f'{method} {path} HTTP/1.1', 'Host: localhost', 'Connection: close', *headers]
+    if body:
+        request.append(f'Content-Length: {len(body)}')
+    writer.write(('\r\n'.join(request) + '\r\n\r\n').encode() + body)
+    raw = await reader.read()
+    writer.close()
+
+    head, _, body = raw.partition(b'\r\n\r\n')
+    status_line, *header_lines = head.decode().split('\r\n')
+    response_headers = dict(line.split(': ', 1) for line in header_lines)
+    return int(status_line.split()[1]), response_headers, body
+
+
+def run_against(server, *requests):
+    async def scenario():
+        listener = await server.serve('127.0.0.1', 0)
+        port = listener.sockets[0].getsockname()[1]
+        async with listener:
+            return [await fetch(port, *request) for request in requests]
+
+    return asyncio.run(scenario())
+
+
+def test_serves_series_and_growth():
+    (status, _, series), (_, _, segment), (_, _, growth), (missing, _, _) = run_against(
+        RevenueServer(DATA, formats=()), ('/series',), ('/series/data_center',), ('/growth',), ('/chart.png',))
+
+    assert status == 200
+    assert RevenueData.from_dict(json.loads(series)) == DATA
+    assert json.loads(segment)['values'] == [26272, 30771]
+    assert json.loads(growth)['qoq']['total'] == [None, 16.7843]
+    assert missing == 404
+
+
+def test_conditional_get_returns_not_modified():
+    server = RevenueServer(DATA, formats=('svg',))
+    (status, headers, body), = run_against(server, ('/chart.svg',))
+    assert status == 200
+    assert headers['Content-Type'] == 'image/svg+xml'
+    assert body.startswith(b'<?xml')
+
+    (status, _, body), = run_against(server, ('/chart.svg', [f'If-None-Match: {headers["ETag"]}']))
+    assert status == 304
+    assert body == b''
+
+
+def test_uploaded_pdf_is_extracted_in_the_background():
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            jobs = ExtractionJobs(executor, max_queued=2, concurrency=1)
+            listener = await RevenueServer(jobs=jobs).serve('127.0.0.1', 0)
+            port = listener.sockets[0].getsockname()[1]
+            jobs.start()
+            async with listener:
+                status, headers, body = await fetch(port, '/jobs', method='POST', body=PDF_PATH.read_bytes())
+                assert status == 202
+                await jobs.queue.join()
+                result = await fetch(port, headers['Location'])
+            await jobs.stop()
+            return json.loads(body), result
+
+    job, (status, _, body) = asyncio.run(scenario())
+    assert job['status'] == 'queued'
+    assert status == 200
+    finished = json.loads(body)
+    assert finished['status'] == 'done'
+    assert RevenueData.from_dict(finished['result'])['total'][-1] == 35082
+
+
+def test_uploads_use_the_configured_extraction():
+    def extract(body):
+        return RevenueData(['Q3 FY25'], ['total'], [[len(body)]])
+
+    async def scenario():
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            jobs = ExtractionJobs(executor, concurrency=1, extract=extract)
+            jobs.start()
+            job = jobs.submit(b'%PDF-1.4')
+            await jobs.queue.join()
+            await jobs.stop()
+            return job
+
+    job = asyncio.run(scenario())
+    assert job['status'] == 'done'
+    assert job['result']['values'] == [[8]]
+
+
+def test_full_queue_refuses_uploads():
+    jobs = ExtractionJobs(executor=None, max_queued=1, concurrency=1)
+    (first, _, _), (second, headers, _), (not_pdf, _, _), (missing, _, _) = run_against(
+        RevenueServer(jobs=jobs),
+        ('/jobs', (), 'POST', b'%PDF-1.4'), ('/jobs', (), 'POST', b'%PDF-1.4'), ('/jobs', (), 'POST', b'text'),
+        ('/jobs/unknown',))
+
+    assert first == 202
+    assert second == 503
+    assert headers['Retry-After'] == '1'
+    assert not_pdf == 400
+    assert missing == 404
@@ -0,0 +1,44 @@
+from pathlib import Path
+
+import pdfplumber
+
+from utils.table_templates import TableTemplate, clear_templates, load_template, page_fingerprint, save_template
+
+PDF_PATH = Path(__file__).parent.parent / 'Rev_by_Mkt_Qtrly_Trend_Q325.pdf'
+
+
+def test_learned_template_slices_the_same_table():
+    with pdfplumber.open(PDF_PATH) as pdf:
+        page = pdf.pages[0]
+        found = page.find_tables()[0]
+        template = TableTemplate.from_table(found)
+
+        assert len(template.columns) == 10 and len(template.rows) == 8
+        assert template.slice(page.chars) == found.extract()
+
+
+def test_fingerprint_ignores_figures_but_not_layout():
+    with pdfplumber.open(PDF_PATH) as pdf:
+        page = pdf.pages[0]
+        fingerprint = page_fingerprint(page)
+
+        # A later quarter changes the figures and the year digits, not where the static text sits
+        restated = page.filter(lambda obj: obj.get('text') != '7')
+        assert page_fingerprint(restated) == fingerprint
+
+        moved = page.filter(lambda obj: obj.get('text') != 'G')
+        assert page_fingerprint(moved) != fingerprint
+
+
+def test_templates_persist_across_processes(tmp_path):
+    template = TableTemplate((84.2, 603.5, 2795.8), (351.7, 517.8, 1367.3))
+
+    assert load_template(str(tmp_path), 'abc') is None
+    save_template(str(tmp_path), 'abc', template)
+    assert load_template(str(tmp_path), 'abc') == template
+
+    (tmp_path / 'broken.json').write_text('{')
+    assert load_template(str(tmp_path), 'broken') is None
+
+    clear_templates(str(tmp_path))
+    assert load_template(str(tmp_path), 'abc') is None
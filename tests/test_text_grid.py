@@ -0,0 +1,33 @@
+from utils.text_grid import build_table
+
+
+def test_build_table_from_text_runs():
+    runs = [
+        (100, 500, 200, 520, '($ in millions) '),
+        (300, 500, 310, 520, 'Q'),
+        (311, 500, 320, 520, '2 '),
+        (330, 500, 380, 520, 'FY25'),
+        (500, 500, 580, 520, 'Q1 FY25'),
+        (100, 400, 200, 420, 'Data Center '),
+        (330, 400, 340, 420, '$'),
+        (341, 400, 380, 420, '26,272 '),
+        (530, 400, 580, 420, '$22,563'),
+        (100, 312, 200, 332, 'Professional '),
+        (100, 288, 200, 308, 'Visualization '),
+        (350, 300, 380, 320, '454 '),
+        (550, 300, 580, 320, '427'),
+        (100, 200, 200, 220, 'TOTAL '),
+        (330, 200, 380, 220, '$26,726 '),
+        (530, 200, 580, 220, '$22,990'),
+    ]
+
+    assert build_table(runs) == [
+        ['($ in millions)', 'Q2 FY25', 'Q1 FY25'],
+        ['Data Center', '$26,272', '$22,563'],
+        ['Professional\nVisualization', '454', '427'],
+        ['TOTAL', '$26,726', '$22,990'],
+    ]
+
+
+def test_build_table_without_header():
+    assert build_table([(100, 400, 200, 420, 'Data Center')]) == []
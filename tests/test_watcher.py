@@ -0,0 +1,44 @@
+import threading
+import time
+
+import pytest
+
+from utils.watcher import PollingWatcher, watch_directory
+
+
+def test_polling_watcher_reports_new_and_changed_pdfs(tmp_path):
+    (tmp_path / 'old.pdf').write_bytes(b'old')
+    watcher = PollingWatcher(str(tmp_path))
+
+    (tmp_path / 'new.pdf').write_bytes(b'new')
+    (tmp_path / 'notes.txt').write_bytes(b'ignored')
+    assert watcher.poll(0) == {str(tmp_path / 'new.pdf')}
+
+    (tmp_path / 'old.pdf').write_bytes(b'changed')
+    assert watcher.poll(0) == {str(tmp_path / 'old.pdf')}
+    assert watcher.poll(0) == set()
+
+
+@pytest.mark.parametrize('use_inotify', [True, False])
+def test_watch_directory_debounces_writes(tmp_path, use_inotify):
+    batches = []
+    stop = threading.Event()
+
+    def handle(paths):
+        batches.append(paths)
+        stop.set()
+
+    thread = threading.Thread(target=watch_directory, args=(str(tmp_path), handle),
+                              kwargs={'debounce': 0.2, 'poll_interval': 0.05, 'stop': stop,
+                                      'use_inotify': use_inotify})
+    thread.start()
+    time.sleep(0.1)
+    # Several writes in quick succession become a single hand-over
+    for chunk in (b'%PDF', b'-1.4', b'...'):
+        with open(tmp_path / 'filing.pdf', 'ab') as pdf:
+            pdf.write(chunk)
+        time.sleep(0.05)
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+    assert batches == [[str(tmp_path / 'filing.pdf')]]
@@ -0,0 +1,28 @@
+import fnmatch
+import tarfile
+import zipfile
+
+ARCHIVE_SUFFIXES = ('.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tbz2', '.tar.xz', '.txz')
+# Everything that can go wrong opening or reading a broken archive; zipfile raises RuntimeError for an encrypted
+# member and NotImplementedError for an unsupported compression method
+ARCHIVE_ERRORS = (OSError, EOFError, RuntimeError, NotImplementedError, tarfile.TarError, zipfile.BadZipFile)
+
+
+def is_archive(path: str) -> bool:
+    return path.lower().endswith(ARCHIVE_SUFFIXES)
+
+
+def iter_archive_pdfs(archive_path: str, pattern: str = '*.pdf'):
+    # Yield (member name, PDF bytes) one member at a time, straight out of the archive without touching disk
+    if zipfile.is_zipfile(archive_path):
+        with zipfile.ZipFile(archive_path) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and fnmatch.fnmatch(info.filename.lower(), pattern):
+                    yield info.filename, archive.read(info)
+        return
+
+    # 'r|*' reads the tarball as a stream, so compressed archives are decompressed once, front to back
+    with tarfile.open(archive_path, 'r|*') as archive:
+        for member in archive:
+            if member.isfile() and fnmatch.fnmatch(member.name.lower(), pattern):
+                yield member.name, archive.extractfile(member).read()
@@ -0,0 +1,60 @@
+import struct
+
+import numpy as np
+
+from utils.files import atomic_write
+from utils.revenue_data import RevenueData
+
+MAGIC = b'NVRV'
+FORMAT_VERSION = 2
+# magic, format version, segment count, quarter count, label table offset, label table length
+HEADER = struct.Struct('<4sHxxIIQQ')
+# The int64 matrix starts right after the header, padded to keep it 8-byte aligned; the missing mask follows it as
+# packed bits, then the labels
+MATRIX_OFFSET = (HEADER.size + 7) // 8 * 8
+LABEL_LENGTH = struct.Struct('<H')
+
+
+def write_binary(data: RevenueData, path: str) -> None:
+    matrix = data.values.astype('<i8', copy=False).tobytes()
+    labels = b''.join(LABEL_LENGTH.pack(len(encoded)) + encoded
+                      for encoded in (label.encode() for label in data.quarters + data.segments))
+    missing = np.packbits(data.missing, axis=None).tobytes()
+    labels_offset = MATRIX_OFFSET + len(matrix) + len(missing)
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, len(data.segments), len(data.quarters), labels_offset, len(labels))
+
+    # Written atomically, so readers never map a half-written file
+    with atomic_write(path, 'wb') as output:
+        output.write(header.ljust(MATRIX_OFFSET, b'\0'))
+        output.write(matrix)
+        output.write(missing)
+        output.write(labels)
+
+
+def load_binary(path: str) -> RevenueData:
+    with open(path, 'rb') as source:
+        magic, version, segment_count, quarter_count, labels_offset, labels_length = HEADER.unpack(
+            source.read(HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"'{path}' is not a version {FORMAT_VERSION} revenue series file.")
+        source.seek(MATRIX_OFFSET + segment_count * quarter_count * 8)
+        missing = np.unpackbits(np.frombuffer(source.read(labels_offset - source.tell()), dtype=np.uint8),
+                                count=segment_count * quarter_count).astype(bool)
+        source.seek(labels_offset)
+        labels = read_labels(source.read(labels_length), quarter_count + segment_count)
+
+    # The matrix is mapped straight from the file rather than read into memory
+    values = np.memmap(path, dtype='<i8', mode='r', offset=MATRIX_OFFSET, shape=(segment_count, quarter_count))
+    return RevenueData(labels[:quarter_count], labels[quarter_count:], values,
+                       missing.reshape(segment_count, quarter_count))
+
+
+def read_labels(buffer: bytes, count: int) -> list[str]:
+    labels = []
+    position = 0
+    for _ in range(count):
+        (length,) = LABEL_LENGTH.unpack_from(buffer, position)
+        position += LABEL_LENGTH.size
+        labels.append(buffer[position:position + length].decode())
+        position += length
+    return labels
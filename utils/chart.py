@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+
+DEFAULT_OUTPUT = 'nvidia-revenue-trend.png'
+FORMATS = ('png', 'svg', 'pdf', 'webp')
+# Bump whenever a change to the drawing code alters the chart, so charts rendered before it are redrawn
+CHART_VERSION = '1'
+
+
+def use_headless_backend(force: bool = False) -> None:
+    # Without a display there is nothing to show, so skip GUI backend discovery entirely
+    if not force and os.environ.get('MPLBACKEND'):
+        return
+    headless = sys.platform.startswith('linux') and not (os.environ.get('DISPLAY') or os.environ.get('WAYLAND_DISPLAY'))
+    if force or headless:
+        import matplotlib
+        matplotlib.use('Agg')
+
+
+def create_figure():
+    # matplotlib is only imported once a chart is actually requested
+    use_headless_backend()
+    import matplotlib.pyplot as plt
+
+    return plt.subplots(figsize=(14, 8))
+
+
+def draw_chart(fig, ax, data, growth_rates: list[str]) -> None:
+    quarters = data.quarters
+    total = data['total']
+
+    # Step 5: Plotting, reusing a figure that may already hold an earlier chart
+    ax.clear()
+    x = np.arange(len(quarters))  # the label locations
+    width = 0.15  # the width of the bars
+    bar_positions = [x + (i - 2) * width for i in range(len(data.segments))]
+
+    # Segment keys were normalised when the table was parsed, so they label the bars as they are
+    for pos, label, values in zip(bar_positions, data.segments, data.values):
+        ax.bar(pos, values, width, label=label)
+
+    # Step 6: Add growth rate annotations
+    for i, rate in enumerate(growth_rates):
+        ax.annotate(rate, (x[i], total[i]), textcoords="offset points", xytext=(0, 5), ha='center')
+
+    # Step 7: Add some text for labels, title, and custom x-axis tick labels, etc.
+    ax.set_xlabel('Quarter')
+    ax.set_ylabel('Revenue ($ in millions)')
+    ax.set_title('NVIDIA Quarterly Revenue Trend by Market')
+    ax.set_xticks(x)
+    # Rotate the tick labels for better readability
+    ax.set_xticklabels(quarters, rotation=45)
+    ax.legend()
+
+    fig.tight_layout()
+
+
+def output_paths(output: str = DEFAULT_OUTPUT, formats: list[str] | None = None) -> list[str]:
+    # Without explicit formats the output suffix decides, otherwise every format shares the output stem
+    stem, suffix = os.path.splitext(output)
+    if not formats:
+        return [output if suffix else f'{output}.png']
+    return [f'{stem}.{fmt}' for fmt in dict.fromkeys(formats)]
+
+
+def save_chart(fig, output: str = DEFAULT_OUTPUT, formats: list[str] | None = None,
+               dpi: float | None = None) -> list[str]:
+    # The figure is drawn once and only re-encoded per format
+    paths = output_paths(output, formats)
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    for path in paths:
+        fig.savefig(path, dpi=dpi or 'figure')
+    return paths
+
+
+def chart_fingerprint(data, formats: list[str] | None = None, dpi: float | None = None) -> str:
+    # Render settings are part of the fingerprint, so changing them still re-renders
+    settings = json.dumps({'version': CHART_VERSION, 'formats': sorted(set(formats or [])), 'dpi': dpi})
+    return hashlib.sha256(f'{data.fingerprint()}:{settings}'.encode()).hexdigest()
+
+
+def fingerprint_path(output: str = DEFAULT_OUTPUT) -> str:
+    return f'{os.path.splitext(output)[0]}.fingerprint'
+
+
+def is_up_to_date(fingerprint: str, output: str = DEFAULT_OUTPUT, formats: list[str] | None = None) -> bool:
+    if not all(os.path.exists(path) for path in output_paths(output, formats)):
+        return False
+    try:
+        with open(fingerprint_path(output)) as stored:
+            return stored.read().strip() == fingerprint
+    except FileNotFoundError:
+        return False
+
+
+def write_fingerprint(fingerprint: str, output: str = DEFAULT_OUTPUT) -> None:
+    with open(fingerprint_path(output), 'w') as stored:
+        stored.write(f'{fingerprint}\n')
+
+
+def show_charts() -> None:
+    import matplotlib.pyplot as plt
+
+    # The Agg backend cannot open a window, so showing would only warn
+    if plt.get_backend().lower() != 'agg':
+        plt.show()
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import os
+
+from utils.files import atomic_write, json_entries, remove_file, remove_json_files
+
+DEFAULT_CACHE_DIR = os.path.join('.cache', 'extraction')
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+class ExtractionCache:
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, version: str = '',
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.version = version
+        self.max_bytes = max_bytes
+
+    def key(self, source) -> str:
+        # Key on the parser version as well, so parser changes invalidate old entries
+        return content_key(source, self.version)
+
+    def get(self, key: str) -> dict | None:
+        path = self._entry_path(key)
+        try:
+            with open(path) as entry:
+                data = json.load(entry)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # A corrupt entry is as good as a miss
+            remove_file(path)
+            return None
+
+        # Touch the entry so eviction sees it as recently used
+        os.utime(path)
+        return data
+
+    def put(self, key: str, data: dict) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with atomic_write(self._entry_path(key)) as entry:
+            json.dump(data, entry)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for entry in json_entries(self.cache_dir):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        # Drop least recently used entries until the cache fits its budget
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total_size <= self.max_bytes:
+                break
+            remove_file(path)
+            total_size -= size
+
+    def clear(self) -> None:
+        remove_json_files(self.cache_dir)
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f'{key}.json')
+
+def content_key(source, version: str = '') -> str:
+    digest = hashlib.sha256(version.encode())
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as pdf_file:
+            update_from_stream(digest, pdf_file)
+    elif hasattr(source, 'read'):
+        # Hash a file object from the start and leave it rewound for the parser
+        source.seek(0)
+        update_from_stream(digest, source)
+        source.seek(0)
+    else:
+        # bytes, memoryview and mmap are hashed in place
+        digest.update(source)
+    return digest.hexdigest()
+
+
+def update_from_stream(digest, stream) -> None:
+    for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+        digest.update(chunk)
@@ -0,0 +1,31 @@
+import os
+from contextlib import contextmanager
+
+
+@contextmanager
+def atomic_write(path: str, mode: str = 'w'):
+    # Write to a temporary file first, so readers and other processes never see a half-written file
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, mode) as output:
+        yield output
+    os.replace(temp_path, path)
+
+
+def json_entries(directory: str) -> list[os.DirEntry]:
+    try:
+        with os.scandir(directory) as entries:
+            return [entry for entry in entries if entry.name.endswith('.json')]
+    except FileNotFoundError:
+        return []
+
+
+def remove_file(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_json_files(directory: str) -> None:
+    for entry in json_entries(directory):
+        remove_file(entry.path)
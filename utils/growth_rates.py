@@ -0,0 +1,30 @@
+import numpy as np
+
+
+def growth_rates(values, lag: int = 1) -> np.ndarray:
+    # Percentage growth along the last axis versus `lag` quarters earlier, for every row at once
+    values = np.asarray(values, dtype=np.float64)
+    rates = np.full(values.shape, np.nan)
+    if lag < 1 or lag >= values.shape[-1]:
+        return rates
+
+    current = values[..., lag:]
+    previous = values[..., :-lag]
+    # Quarters without a prior value or with a zero denominator stay NaN
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rates[..., lag:] = np.where(previous != 0, (current - previous) / previous * 100, np.nan)
+    return rates
+
+
+def quarter_over_quarter(values) -> np.ndarray:
+    return growth_rates(values, lag=1)
+
+
+def year_over_year(values) -> np.ndarray:
+    return growth_rates(values, lag=4)
+
+
+def format_growth_rate(rate: float, missing: str = '0.00%') -> str:
+    if np.isnan(rate):
+        return missing
+    return f'+{rate:.2f}%' if rate > 0 else f'{rate:.2f}%'
@@ -0,0 +1,97 @@
+import json
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+METRIC_PREFIX = 'nvidia_revenue_stage'
+
+
+class StageRecorder:
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+        self._open_peaks = []
+
+    @contextmanager
+    def stage(self, name: str):
+        self._enter_memory()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.process_time() - cpu_start
+            self._record(name, wall, cpu, self._exit_memory())
+
+    def _enter_memory(self) -> None:
+        if not self.trace_memory:
+            return
+        # Credit the peak so far to the enclosing stages before restarting the peak for this one
+        _, peak = tracemalloc.get_traced_memory()
+        self._open_peaks = [max(open_peak, peak) for open_peak in self._open_peaks]
+        self._open_peaks.append(0)
+        tracemalloc.reset_peak()
+
+    def _exit_memory(self) -> int:
+        if not self.trace_memory:
+            return 0
+        _, peak = tracemalloc.get_traced_memory()
+        peak = max(self._open_peaks.pop(), peak)
+        if self._open_peaks:
+            self._open_peaks[-1] = max(self._open_peaks[-1], peak)
+        return peak
+
+    def _record(self, name: str, wall: float, cpu: float, peak: int) -> None:
+        stage = self.stages.setdefault(name, {'calls': 0, 'wall_seconds': 0.0, 'cpu_seconds': 0.0})
+        stage['calls'] += 1
+        stage['wall_seconds'] += wall
+        stage['cpu_seconds'] += cpu
+        # Without tracemalloc there is no peak to report, rather than a misleading zero
+        if self.trace_memory:
+            stage['peak_memory_bytes'] = max(stage.get('peak_memory_bytes', 0), peak)
+
+    def to_json(self) -> str:
+        return json.dumps({'stages': self.stages}, indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric, kind in (('calls', 'counter'), ('wall_seconds', 'gauge'), ('cpu_seconds', 'gauge'),
+                             ('peak_memory_bytes', 'gauge')):
+            recorded = {stage: values[metric] for stage, values in self.stages.items() if metric in values}
+            if not recorded:
+                continue
+            name = f'{METRIC_PREFIX}_{metric}'
+            lines.append(f'# TYPE {name} {kind}')
+            for stage, value in recorded.items():
+                lines.append(f'{name}{{stage="{stage}"}} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+_recorder = None
+
+
+def start_recording(trace_memory: bool = True) -> StageRecorder:
+    global _recorder
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _recorder = StageRecorder(trace_memory)
+    return _recorder
+
+
+def stop_recording() -> StageRecorder | None:
+    global _recorder
+    recorder, _recorder = _recorder, None
+    if recorder is not None and recorder.trace_memory:
+        tracemalloc.stop()
+    return recorder
+
+
+@contextmanager
+def stage(name: str):
+    # A no-op unless recording was started, so instrumented code pays nothing by default
+    if _recorder is None:
+        yield
+        return
+    with _recorder.stage(name):
+        yield
@@ -0,0 +1,23 @@
+import re
+from functools import lru_cache
+
+NON_ALNUM = re.compile(r'[^a-z0-9]+')
+
+# Other spellings NVIDIA has used for its markets, mapped to the canonical segment keys
+SEGMENT_ALIASES = {
+    'datacenter': 'data_center',
+    'pro_visualization': 'professional_visualization',
+    'professional_visualisation': 'professional_visualization',
+    'automotive': 'auto',
+    'automotive_and_robotics': 'auto',
+    'oem_and_other': 'oem_other',
+    'oem_ip': 'oem_other',
+    'total_revenue': 'total',
+}
+
+
+@lru_cache(maxsize=1024)
+def normalize_label(text: str) -> str:
+    # Collapse every run of non-alphanumerics into one underscore in a single pass
+    key = NON_ALNUM.sub('_', text.lower()).strip('_')
+    return SEGMENT_ALIASES.get(key, key)
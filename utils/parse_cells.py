@@ -0,0 +1,29 @@
+import numpy as np
+
+# Currency symbols, thousands separators and spaces go; accounting parentheses become a minus sign
+CELL_REPLACEMENTS = (('$', ''), (',', ''), (' ', ''), ('\u00a0', ''), ('\n', ''), ('(', '-'), (')', ''),
+                     ('\u2212', '-'))
+MISSING_CELLS = frozenset({'', '-', '--', '\u2013', '\u2014', 'n/a', 'N/A', 'NA', 'nm', 'NM'})
+# Stands in for missing cells until the mask is taken; no revenue figure comes anywhere near it
+_MISSING = np.iinfo(np.int64).min
+_SEPARATOR = '\x1f'
+
+
+def parse_cells(rows: list[list[str | None]], width: int) -> tuple[np.ndarray, np.ndarray]:
+    # Convert every cell of the table in one pass: an int64 matrix plus a mask of the cells that hold no number
+    if any(len(row) > width for row in rows):
+        raise ValueError(f'A row has more than {width} values.')
+    if not rows or not width:
+        return np.zeros((len(rows), width), dtype=np.int64), np.zeros((len(rows), width), dtype=bool)
+
+    # Clean the whole table as one string, which is far cheaper than cleaning cell by cell
+    text = _SEPARATOR.join(_SEPARATOR.join([cell or '' for cell in row] + [''] * (width - len(row)))
+                           for row in rows)
+    for old, new in CELL_REPLACEMENTS:
+        text = text.replace(old, new)
+
+    values = np.array([_MISSING if cell in MISSING_CELLS else int(cell) for cell in text.split(_SEPARATOR)],
+                      dtype=np.int64).reshape(len(rows), width)
+    missing = values == _MISSING
+    values[missing] = 0
+    return values, missing
@@ -0,0 +1,73 @@
+import io
+import os
+from contextlib import contextmanager, nullcontext
+
+
+class BufferReader(io.RawIOBase):
+    # A seekable read-only stream over any buffer (bytes, bytearray, memoryview, mmap) that never copies it whole
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast('B')
+        self._position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        with self._view[self._position:self._position + len(target)] as chunk:
+            memoryview(target).cast('B')[:len(chunk)] = chunk
+            self._position += len(chunk)
+            return len(chunk)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: len(self._view)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self) -> None:
+        # Let go of the buffer straight away, so the caller can close an mmap it handed in
+        self._view.release()
+        super().close()
+
+
+def is_path(source) -> bool:
+    return isinstance(source, (str, os.PathLike))
+
+
+def is_stream(source) -> bool:
+    return all(callable(getattr(source, name, None)) for name in ('read', 'readinto', 'seek', 'tell'))
+
+
+@contextmanager
+def pdfium_input(source):
+    # pdfium loads paths and bytes natively; anything else is read through a stream callback
+    if is_path(source):
+        yield os.fspath(source)
+    elif isinstance(source, bytes):
+        yield source
+    else:
+        with as_stream(source) as stream:
+            yield stream
+
+
+@contextmanager
+def pdfplumber_input(source):
+    # pdfminer only takes a path or a seekable stream
+    if is_path(source):
+        yield source
+    else:
+        with as_stream(source) as stream:
+            yield stream
+
+
+def as_stream(source):
+    if is_stream(source):
+        # Offsets inside a PDF are absolute, so it has to be read from the start; the caller keeps it open
+        source.seek(0)
+        return nullcontext(source)
+    return BufferReader(source)
@@ -0,0 +1,60 @@
+import cProfile
+import os
+import sys
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+
+class StackSampler:
+    def __init__(self, thread_id: int, interval: float = 0.001):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name='stack-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            names = []
+            while frame is not None:
+                code = frame.f_code
+                names.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})')
+                frame = frame.f_back
+            # Collapsed stacks list frames root first, separated by semicolons
+            self.stacks[';'.join(reversed(names))] += 1
+
+    def write_collapsed(self, path: str) -> None:
+        with open(path, 'w') as output:
+            for stack, count in self.stacks.most_common():
+                output.write(f'{stack} {count}\n')
+
+
+def collapsed_path(path: str) -> str:
+    return f'{os.path.splitext(path)[0]}.collapsed'
+
+
+@contextmanager
+def profile(path: str, interval: float = 0.001):
+    # cProfile gives exact call counts, the sampler gives whole stacks for flamegraphs
+    profiler = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), interval)
+    sampler.start()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        sampler.stop()
+        profiler.dump_stats(path)
+        sampler.write_collapsed(collapsed_path(path))
@@ -0,0 +1,85 @@
+import hashlib
+import json
+import re
+
+import numpy as np
+
+QUARTER_PATTERN = re.compile(r'^Q([1-4]) FY(\d{2})$')
+
+
+def quarter_key(quarter: str) -> int:
+    # 'Q3 FY25' -> a number that sorts quarters chronologically
+    match = QUARTER_PATTERN.match(quarter)
+    if not match:
+        raise ValueError(f"Unrecognised quarter '{quarter}'.")
+    return int(match.group(2)) * 4 + int(match.group(1)) - 1
+
+
+class RevenueData:
+    def __init__(self, quarters: list[str], segments: list[str], values, missing=None):
+        self.quarters = list(quarters)
+        self.segments = list(segments)
+        # One contiguous segments x quarters matrix, so rows are cheap views
+        self.values = np.ascontiguousarray(values, dtype=np.int64)
+
+        if self.values.shape != (len(self.segments), len(self.quarters)):
+            raise ValueError(f"Expected {len(self.segments)} x {len(self.quarters)} values, "
+                             f"got {' x '.join(map(str, self.values.shape))}.")
+
+        # Cells the source left blank or dashed; their value is stored as 0
+        if missing is None:
+            self.missing = np.zeros(self.values.shape, dtype=bool)
+        else:
+            self.missing = np.ascontiguousarray(missing, dtype=bool)
+            if self.missing.shape != self.values.shape:
+                raise ValueError('The missing mask must have the same shape as the values.')
+
+        self._segment_index = {segment: i for i, segment in enumerate(self.segments)}
+        self._quarter_index = {quarter: i for i, quarter in enumerate(self.quarters)}
+
+    @classmethod
+    def from_rows(cls, quarters: list[str], rows: dict[str, list[int]]) -> 'RevenueData':
+        return cls(quarters, list(rows), list(rows.values()))
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'RevenueData':
+        return cls(data['quarters'], data['segments'], data['values'], data.get('missing'))
+
+    def to_dict(self) -> dict:
+        data = {'quarters': self.quarters, 'segments': self.segments, 'values': self.values.tolist()}
+        if self.missing.any():
+            data['missing'] = self.missing.tolist()
+        return data
+
+    def __getitem__(self, segment: str) -> np.ndarray:
+        return self.values[self._segment_index[segment]]
+
+    def __contains__(self, segment: str) -> bool:
+        return segment in self._segment_index
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, RevenueData):
+            return NotImplemented
+        return (self.quarters == other.quarters and self.segments == other.segments
+                and np.array_equal(self.values, other.values) and np.array_equal(self.missing, other.missing))
+
+    def __repr__(self) -> str:
+        return f'RevenueData(quarters={self.quarters!r}, segments={self.segments!r})'
+
+    def fingerprint(self) -> str:
+        # Identifies the dataset itself, independent of which PDF bytes it came from
+        digest = hashlib.sha256(json.dumps([self.quarters, self.segments]).encode())
+        digest.update(self.values.astype('<i8').tobytes())
+        if self.missing.any():
+            digest.update(np.packbits(self.missing).tobytes())
+        return digest.hexdigest()
+
+    def float_values(self) -> np.ndarray:
+        # The matrix as floats with missing cells as NaN, which growth rates skip over
+        return np.where(self.missing, np.nan, self.values)
+
+    def quarter_index(self, quarter: str) -> int:
+        return self._quarter_index[quarter]
+
+    def segment_index(self, segment: str) -> int:
+        return self._segment_index[segment]
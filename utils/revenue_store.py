@@ -0,0 +1,113 @@
+import sqlite3
+from datetime import datetime, timezone
+
+import numpy as np
+
+from utils.revenue_data import RevenueData, quarter_key
+
+DEFAULT_STORE_PATH = 'revenue.sqlite'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    fingerprint TEXT NOT NULL UNIQUE,
+    as_of INTEGER NOT NULL,
+    ingested_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revenue (
+    quarter TEXT NOT NULL,
+    quarter_key INTEGER NOT NULL,
+    segment TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    as_of INTEGER NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    PRIMARY KEY (quarter, segment)
+);
+CREATE TABLE IF NOT EXISTS restatements (
+    quarter TEXT NOT NULL,
+    segment TEXT NOT NULL,
+    previous_value INTEGER NOT NULL,
+    value INTEGER NOT NULL,
+    source_id INTEGER NOT NULL REFERENCES sources (id),
+    recorded_at TEXT NOT NULL
+);
+'''
+
+
+class RevenueStore:
+    def __init__(self, path: str = DEFAULT_STORE_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+
+    def __enter__(self) -> 'RevenueStore':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def ingest(self, data: RevenueData, source: str) -> int:
+        # Re-ingesting a dataset that is already stored is a no-op
+        fingerprint = data.fingerprint()
+        if self.connection.execute('SELECT 1 FROM sources WHERE fingerprint = ?', (fingerprint,)).fetchone():
+            return 0
+
+        # Check every quarter label before writing anything, so a bad header raises ValueError and stores nothing
+        quarter_keys = {quarter: quarter_key(quarter) for quarter in data.quarters}
+
+        # A PDF covering later quarters is the authority for the quarters it shares with older ones
+        as_of = max(quarter_keys.values())
+        now = datetime.now(timezone.utc).isoformat()
+        restated = 0
+        with self.connection:
+            source_id = self.connection.execute(
+                'INSERT INTO sources (name, fingerprint, as_of, ingested_at) VALUES (?, ?, ?, ?)',
+                (source, fingerprint, as_of, now)).lastrowid
+
+            for position, segment in enumerate(data.segments):
+                for quarter, value, missing in zip(data.quarters, data[segment].tolist(), data.missing[position]):
+                    # A blank cell says nothing about the quarter, so it never overrides a stored value
+                    if missing:
+                        continue
+                    existing = self.connection.execute(
+                        'SELECT value, as_of FROM revenue WHERE quarter = ? AND segment = ?',
+                        (quarter, segment)).fetchone()
+                    if existing and existing[1] > as_of:
+                        continue
+                    if existing and existing[0] != value:
+                        self.connection.execute(
+                            'INSERT INTO restatements (quarter, segment, previous_value, value, source_id, recorded_at)'
+                            ' VALUES (?, ?, ?, ?, ?, ?)', (quarter, segment, existing[0], value, source_id, now))
+                        restated += 1
+                    self.connection.execute(
+                        'INSERT OR REPLACE INTO revenue (quarter, quarter_key, segment, position, value, as_of, source_id)'
+                        ' VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (quarter, quarter_keys[quarter], segment, position, value, as_of, source_id))
+        return restated
+
+    def load(self) -> RevenueData | None:
+        quarters = [row[0] for row in self.connection.execute(
+            'SELECT DISTINCT quarter FROM revenue ORDER BY quarter_key')]
+        segments = [row[0] for row in self.connection.execute(
+            'SELECT segment FROM revenue GROUP BY segment ORDER BY MIN(position), segment')]
+        if not quarters:
+            return None
+
+        quarter_index = {quarter: i for i, quarter in enumerate(quarters)}
+        segment_index = {segment: i for i, segment in enumerate(segments)}
+        values = np.zeros((len(segments), len(quarters)), dtype=np.int64)
+        missing = np.ones(values.shape, dtype=bool)
+        for quarter, segment, value in self.connection.execute('SELECT quarter, segment, value FROM revenue'):
+            values[segment_index[segment], quarter_index[quarter]] = value
+            missing[segment_index[segment], quarter_index[quarter]] = False
+        return RevenueData(quarters, segments, values, missing)
+
+    def restatements(self) -> list[tuple[str, str, int, int, str]]:
+        return self.connection.execute(
+            'SELECT r.quarter, r.segment, r.previous_value, r.value, s.name FROM restatements r'
+            ' JOIN sources s ON s.id = r.source_id ORDER BY r.rowid').fetchall()
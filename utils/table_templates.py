@@ -0,0 +1,71 @@
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from typing import NamedTuple
+
+from pdfplumber.utils import extract_text
+
+from utils.files import atomic_write, remove_json_files
+
+# Characters that change from quarter to quarter; everything else on the page is the static layout
+VARIABLE_CHARS = frozenset('0123456789$,.()-%')
+
+
+class TableTemplate(NamedTuple):
+    # Cell boundaries in page coordinates: n + 1 x positions for n columns, m + 1 tops for m rows
+    columns: tuple[float, ...]
+    rows: tuple[float, ...]
+
+    @classmethod
+    def from_table(cls, table) -> 'TableTemplate':
+        # Learn the grid from a table pdfplumber found, so later pages need no ruling line detection
+        columns = [column.bbox[0] for column in table.columns] + [table.columns[-1].bbox[2]]
+        rows = [row.bbox[1] for row in table.rows] + [table.rows[-1].bbox[3]]
+        return cls(tuple(columns), tuple(rows))
+
+    def slice(self, chars: list[dict]) -> list[list[str]]:
+        # Drop each character into the cell holding its midpoint, the same rule pdfplumber's Table.extract uses
+        cells = [[[] for _ in range(len(self.columns) - 1)] for _ in range(len(self.rows) - 1)]
+        for char in chars:
+            column = bisect_right(self.columns, (char['x0'] + char['x1']) / 2) - 1
+            row = bisect_right(self.rows, (char['top'] + char['bottom']) / 2) - 1
+            if 0 <= row < len(cells) and 0 <= column < len(cells[row]):
+                cells[row][column].append(char)
+        return [[extract_text(cell_chars) if cell_chars else '' for cell_chars in row] for row in cells]
+
+
+def page_fingerprint(page) -> str:
+    # Page size plus where the static text sits; quarter labels keep their letters, only the digits move
+    digest = hashlib.sha256(f'{round(page.width)}x{round(page.height)}'.encode())
+    for char in page.chars:
+        if char['text'] not in VARIABLE_CHARS and not char['text'].isspace():
+            digest.update(f"{char['text']}{round(char['x0'])},{round(char['top'])};".encode())
+    return digest.hexdigest()
+
+
+def template_path(directory: str, fingerprint: str) -> str:
+    return os.path.join(directory, f'{fingerprint}.json')
+
+
+def load_template(directory: str, fingerprint: str) -> TableTemplate | None:
+    try:
+        with open(template_path(directory, fingerprint)) as stored:
+            template = json.load(stored)
+        return TableTemplate(tuple(template['columns']), tuple(template['rows']))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, TypeError):
+        # A corrupt template is as good as an unknown layout
+        return None
+
+
+def save_template(directory: str, fingerprint: str, template: TableTemplate) -> None:
+    # Written atomically, since several worker processes may learn the same layout at once
+    os.makedirs(directory, exist_ok=True)
+    with atomic_write(template_path(directory, fingerprint)) as stored:
+        json.dump({'columns': template.columns, 'rows': template.rows}, stored)
+
+
+def clear_templates(directory: str) -> None:
+    remove_json_files(directory)
@@ -0,0 +1,79 @@
+from utils.revenue_data import QUARTER_PATTERN
+
+
+def build_table(runs: list[tuple[float, float, float, float, str]]) -> list[list[str]]:
+    # Each run is (left, bottom, right, top, text) in PDF coordinates, with the origin bottom-left
+    lines = group_lines(runs)
+
+    header_index = next((i for i, line in enumerate(lines) if is_header(merge_cells(line))), None)
+    if header_index is None:
+        return []
+
+    header = merge_cells(lines[header_index])
+    quarter_cells = [cell for cell in header if QUARTER_PATTERN.match(cell[2])]
+    label_cells = [cell for cell in header if cell not in quarter_cells]
+    table = [[' '.join(cell[2] for cell in label_cells)] + [cell[2] for cell in quarter_cells]]
+
+    # Split each line below the header into its row label and the values under each quarter
+    first_column = min(left for left, _, _ in quarter_cells)
+    centers = [(left + right) / 2 for left, right, _ in quarter_cells]
+    rows = []
+    for line in lines[header_index + 1:]:
+        label = ''.join(text for left, _, _, _, text in line if left < first_column).strip()
+        values = [''] * len(centers)
+        for left, _, right, _, text in line:
+            if left >= first_column:
+                column = min(range(len(centers)), key=lambda i: abs(centers[i] - (left + right) / 2))
+                values[column] += text
+        values = [value.strip() for value in values]
+        rows.append((line_center(line), line_height(line), label, values))
+
+    # Labels that wrap onto their own lines belong to the adjacent row of values
+    value_rows = [[center, [], values] for center, _, _, values in rows if any(values)]
+    if not value_rows:
+        return []
+    for center, height, label, values in rows:
+        if label:
+            nearest = min(value_rows, key=lambda row: abs(row[0] - center))
+            if abs(nearest[0] - center) <= height:
+                nearest[1].append(label)
+
+    for _, labels, values in value_rows:
+        table.append(['\n'.join(labels)] + values)
+    return table
+
+
+def group_lines(runs):
+    # Cluster runs whose vertical centres fall within half a line height, top to bottom
+    lines = []
+    for run in sorted(runs, key=lambda run: -(run[1] + run[3]) / 2):
+        center = (run[1] + run[3]) / 2
+        height = run[3] - run[1]
+        if lines and abs(line_center(lines[-1]) - center) <= height / 2:
+            lines[-1].append(run)
+        else:
+            lines.append([run])
+    return [sorted(line) for line in lines]
+
+
+def line_center(line):
+    return sum((run[1] + run[3]) / 2 for run in line) / len(line)
+
+
+def line_height(line):
+    return max(run[3] for run in line) - min(run[1] for run in line)
+
+
+def merge_cells(line):
+    # Join neighbouring runs into (left, right, text) cells when the gap is under a line height
+    cells = []
+    for left, bottom, right, top, text in line:
+        if cells and left - cells[-1][1] < top - bottom:
+            cells[-1] = (cells[-1][0], right, cells[-1][2] + text)
+        else:
+            cells.append((left, right, text))
+    return [(left, right, text.strip()) for left, right, text in cells]
+
+
+def is_header(cells):
+    return sum(1 for cell in cells if QUARTER_PATTERN.match(cell[2])) >= 2
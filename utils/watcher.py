@@ -0,0 +1,118 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+# inotify event flags from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+INOTIFY_EVENT = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    def __init__(self, directory: str, pattern: str = '*.pdf'):
+        self.directory = directory
+        self.pattern = pattern
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"Cannot watch '{directory}'")
+
+    def poll(self, timeout: float) -> set[str]:
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            buffer = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        paths = set()
+        offset = 0
+        while offset < len(buffer):
+            _, _, _, length = INOTIFY_EVENT.unpack_from(buffer, offset)
+            offset += INOTIFY_EVENT.size
+            name = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if fnmatch.fnmatch(name, self.pattern):
+                paths.add(os.path.join(self.directory, name))
+        return paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class PollingWatcher:
+    def __init__(self, directory: str, pattern: str = '*.pdf'):
+        self.directory = directory
+        self.pattern = pattern
+        self._snapshot = self._scan()
+
+    def poll(self, timeout: float) -> set[str]:
+        time.sleep(timeout)
+        snapshot = self._scan()
+        changed = {path for path, signature in snapshot.items() if self._snapshot.get(path) != signature}
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        pass
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except FileNotFoundError:
+            return snapshot
+        for entry in entries:
+            if fnmatch.fnmatch(entry.name, self.pattern):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+
+def create_watcher(directory: str, pattern: str = '*.pdf', use_inotify: bool = True):
+    # inotify is Linux only, everything else (or a failing inotify) falls back to polling
+    if use_inotify and sys.platform.startswith('linux'):
+        try:
+            return InotifyWatcher(directory, pattern)
+        except (AttributeError, OSError):
+            pass
+    return PollingWatcher(directory, pattern)
+
+
+def watch_directory(directory: str, handle, debounce: float = 1.0, poll_interval: float = 0.5,
+                    stop: threading.Event | None = None, use_inotify: bool = True) -> None:
+    stop = stop or threading.Event()
+    watcher = create_watcher(directory, use_inotify=use_inotify)
+    pending = {}
+    try:
+        while not stop.is_set():
+            for path in watcher.poll(poll_interval):
+                pending[path] = time.monotonic()
+
+            # A file is handed over once it has been quiet for the debounce period
+            now = time.monotonic()
+            ready = sorted(path for path, seen in pending.items() if now - seen >= debounce)
+            for path in ready:
+                del pending[path]
+            ready = [path for path in ready if os.path.exists(path)]
+            if ready:
+                handle(ready)
+    finally:
+        watcher.close()